@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Iterable
+
+from document import join
+from document import Token
+from document import tokenize
+
+# A logical call: a GraphQL query and its parameters, as returned by the
+# `build_*` functions of luxor.py.
+Call = tuple[str, dict[str, Any] | None]
+
+
+@dataclass
+class _Operation:
+    """
+    A call rewritten so it can live next to others in the same document:
+    its variables and root fields are prefixed with a per-call namespace.
+    """
+
+    operation_type: str
+    definitions: list[Token]
+    selection: list[Token]
+    variables: dict[str, Any]
+    # merged response key -> key the original query expects
+    keys: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(join(self.definitions)) + len(join(self.selection)) + 2
+
+
+@dataclass
+class Batch:
+    """
+    A single merged GraphQL document carrying several logical calls.
+    """
+
+    query: str
+    variables: dict[str, Any]
+    keys: list[dict[str, str]]
+
+    def split(self, json_response: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Splits the response of the merged document back into one response per call,
+        shaped exactly like the response the original query would have returned.
+        """
+
+        data: dict[str, Any] | None = json_response.get("data")
+        errors: list[dict[str, Any]] = json_response.get("errors") or []
+
+        results = []
+        for keys in self.keys:
+            result: dict[str, Any] = {
+                "data": None
+                if data is None
+                else {original: data.get(merged) for merged, original in keys.items()},
+            }
+
+            call_errors = []
+            for error in errors:
+                path = error.get("path") or []
+                if not path:
+                    call_errors.append(error)
+                elif path[0] in keys:
+                    call_errors.append(
+                        {**error, "path": [keys[path[0]], *path[1:]]},
+                    )
+            if call_errors:
+                result["errors"] = call_errors
+
+            results.append(result)
+        return results
+
+
+def _parse(query: str) -> tuple[str, list[Token], list[Token]]:
+    """
+    Returns the operation type, variable definitions and root selection of a
+    single-operation document.
+    """
+
+    tokens = tokenize(query)
+    position = 0
+    operation_type = "query"
+
+    if tokens and tokens[0].value in ("query", "mutation", "subscription"):
+        operation_type = tokens[0].value
+        position = 1
+        if position < len(tokens) and tokens[position].kind == "name":
+            position += 1
+
+    definitions: list[Token] = []
+    if position < len(tokens) and tokens[position].value == "(":
+        end = position + [t.value for t in tokens[position:]].index(")")
+        definitions = tokens[position + 1 : end]
+        position = end + 1
+
+    if (
+        position >= len(tokens)
+        or tokens[position].value != "{"
+        or tokens[-1].value != "}"
+    ):
+        raise ValueError("Only single operation documents can be batched")
+
+    selection = tokens[position + 1 : -1]
+    if any(token.value == "..." for token in selection):
+        raise ValueError("Fragments are not supported in batched operations")
+    if any(token.value == "fragment" for token in tokens[:position]):
+        raise ValueError("Fragments are not supported in batched operations")
+
+    return operation_type, definitions, selection
+
+
+def _namespace(index: int, call: Call) -> _Operation:
+    """
+    Renames the variables of a call and aliases its root fields with a unique prefix.
+    """
+
+    query, params = call
+    prefix = f"op{index}_"
+    operation_type, definitions, selection = _parse(query)
+
+    def rename(token: Token) -> Token:
+        if token.kind == "variable":
+            return Token("variable", f"${prefix}{token.value[1:]}")
+        return token
+
+    definitions = [rename(token) for token in definitions]
+    selection = [rename(token) for token in selection]
+
+    keys: dict[str, str] = {}
+    aliased: list[Token] = []
+    depth = 0
+    position = 0
+    while position < len(selection):
+        token = selection[position]
+        if token.value in ("{", "(", "["):
+            depth += 1
+        elif token.value in ("}", ")", "]"):
+            depth -= 1
+        elif (
+            depth == 0
+            and token.kind == "name"
+            and (not aliased or aliased[-1].value != "@")
+        ):
+            is_alias = (
+                position + 1 < len(selection) and selection[position + 1].value == ":"
+            )
+            merged = prefix + token.value
+            keys[merged] = token.value
+            aliased.append(Token("name", merged))
+            if is_alias:
+                aliased.append(selection[position + 1])
+                aliased.append(selection[position + 2])
+                position += 3
+            else:
+                aliased.append(Token("punctuator", ":"))
+                aliased.append(token)
+                position += 1
+            continue
+
+        aliased.append(token)
+        position += 1
+
+    variables = {f"{prefix}{name}": value for name, value in (params or {}).items()}
+    return _Operation(operation_type, definitions, aliased, variables, keys)
+
+
+def _merge(operations: list[_Operation]) -> Batch:
+    operation_types = {operation.operation_type for operation in operations}
+    if len(operation_types) > 1:
+        raise ValueError("Queries and mutations cannot be batched together")
+
+    definitions = [token for op in operations for token in op.definitions]
+    selection = [token for op in operations for token in op.selection]
+
+    document = [Token("name", operation_types.pop()), Token("name", "batch")]
+    if definitions:
+        document += [Token("punctuator", "("), *definitions, Token("punctuator", ")")]
+    document += [Token("punctuator", "{"), *selection, Token("punctuator", "}")]
+
+    variables: dict[str, Any] = {}
+    for operation in operations:
+        variables.update(operation.variables)
+
+    return Batch(
+        query=join(document),
+        variables=variables,
+        keys=[operation.keys for operation in operations],
+    )
+
+
+def batch_calls(
+    calls: Iterable[Call],
+    max_document_size: int = 16_384,
+    max_operations: int | None = None,
+) -> list[Batch]:
+    """
+    Merges logical calls into as few GraphQL documents as possible.
+
+    calls (iterable): (query, params) tuples, e.g. the output of luxor.py `build_*` functions.
+    max_document_size (int): maximum length of a merged document. A single call larger than it is sent alone.
+    max_operations (int): maximum number of calls merged into one document. Unlimited by default.
+    """
+
+    batches: list[Batch] = []
+    chunk: list[_Operation] = []
+    size = 0
+
+    for index, call in enumerate(calls):
+        operation = _namespace(index, call)
+        if chunk and (
+            size + operation.size > max_document_size
+            or (max_operations is not None and len(chunk) >= max_operations)
+        ):
+            batches.append(_merge(chunk))
+            chunk, size = [], 0
+
+        chunk.append(operation)
+        size += operation.size
+
+    if chunk:
+        batches.append(_merge(chunk))
+    return batches
@@ -0,0 +1,105 @@
+"""
+Compares the JSON backends of `codec.py` on representative Luxor payloads.
+
+    python benchmarks/bench_codec.py --sizes 100 10000 --output codec.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codec import CODECS  # noqa: E402
+from payloads import PAYLOADS  # noqa: E402
+
+# operations benchmarked and a representative request body for each
+OPERATIONS = {
+    "getWorkerDetails": {
+        "duration": {"minutes": 60},
+        "mpn": "BTC",
+        "uname": "subaccount",
+        "first": 1000,
+    },
+    "getHashrateHistory": {
+        "inputUsername": "subaccount",
+        "mpn": "BTC",
+        "inputInterval": "_1_HOUR",
+        "first": 1000,
+    },
+    "getAllTransactionHistory": {"cid": "BTC", "uname": "subaccount", "first": 1000},
+}
+
+
+def _best(statement: Any, number: int, repeat: int) -> float:
+    """
+    Best time of `repeat` runs, in seconds per call.
+    """
+
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number
+
+
+def run(sizes: list[int], repeat: int) -> list[dict[str, Any]]:
+    results = []
+    for operation, variables in OPERATIONS.items():
+        for size in sizes:
+            payload = PAYLOADS[operation](size)
+            body = json.dumps(payload).encode("utf-8")
+            request = {"query": "query " + operation + " {...}", "variables": variables}
+            number = max(1, 100_000 // max(size, 1))
+
+            for name, codec in CODECS.items():
+                results.append(
+                    {
+                        "backend": name,
+                        "operation": operation,
+                        "edges": size,
+                        "bytes": len(body),
+                        "encode_request_us": _best(
+                            lambda codec=codec, request=request: codec.dumps(request),
+                            1000,
+                            repeat,
+                        )
+                        * 1e6,
+                        "decode_response_ms": _best(
+                            lambda codec=codec, body=body: codec.loads(body),
+                            number,
+                            repeat,
+                        )
+                        * 1e3,
+                    },
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+
+    print(
+        f"{'backend':<8} {'operation':<26} {'edges':>7} {'bytes':>11} "
+        f"{'encode req (us)':>16} {'decode resp (ms)':>17}",
+    )
+    for row in results:
+        print(
+            f"{row['backend']:<8} {row['operation']:<26} {row['edges']:>7} "
+            f"{row['bytes']:>11} {row['encode_request_us']:>16.2f} "
+            f"{row['decode_response_ms']:>17.3f}",
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measures the import time of the modules loaded on every CLI invocation with
+`python -X importtime` and fails if it exceeds a budget, so a top-level import
+of a heavy dependency does not slip back in.
+
+    python benchmarks/bench_import.py --budget-ms 60 --output import.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must not be imported by `import luxor`, only by the commands needing them
+HEAVY = ("typer", "rich", "requests", "aiohttp", "pandas", "pyarrow", "dotenv")
+
+
+def importtime(module: str) -> dict[str, int]:
+    """
+    Imports `module` in a fresh interpreter and returns the cumulative import
+    time of every module it loaded, in microseconds.
+    """
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def run(module: str, repeat: int) -> dict[str, Any]:
+    # the best of several runs, the first one also pays for compiling .pyc files
+    runs = [importtime(module) for _ in range(repeat)]
+    best = min(runs, key=lambda times: times[module])
+    return {
+        "module": module,
+        "total_ms": best[module] / 1e3,
+        "heavy": sorted(name for name in best if name in HEAVY),
+        "slowest": sorted(best.items(), key=lambda item: -item[1])[1:11],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="luxor")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.module, args.repeat)
+
+    print(f"import {result['module']}: {result['total_ms']:.1f} ms")
+    for name, microseconds in result["slowest"]:
+        print(f"  {name:<40} {microseconds / 1e3:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failures = []
+    if result["heavy"]:
+        failures.append(f"heavy modules imported: {', '.join(result['heavy'])}")
+    if result["total_ms"] > args.budget_ms:
+        failures.append(
+            f"{result['total_ms']:.1f} ms is over the {args.budget_ms:.0f} ms budget",
+        )
+    if failures:
+        sys.exit("; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+End-to-end benchmarks of `GraphQlClient.request` and of every `RESOLVERS` method,
+run offline against the local mock server of `mock_server.py`. Reports latency,
+throughput and peak memory (tracemalloc) per payload size, and compares a run
+with a previous one to catch regressions.
+
+    python benchmarks/bench_suite.py --sizes 10 1000 100000 --output after.json
+    python benchmarks/bench_suite.py --output after.json --compare before.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import partial
+from typing import Any
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import luxor  # noqa: E402
+from client import GraphQlClient  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+from payloads import PAYLOADS  # noqa: E402
+from resolvers import pa  # noqa: E402
+from resolvers import RESOLVERS  # noqa: E402
+
+Builder = Callable[[int], "tuple[str, dict[str, Any]]"]
+
+# RESOLVERS method -> (payload it resolves, query fetching it sized by `first`)
+# Single objects and counts are benchmarked once, with `sized` False.
+TARGETS: dict[str, tuple[str, Builder | None, bool]] = {
+    "resolve_get_subaccounts": ("users", luxor.build_get_subaccounts, True),
+    "resolve_get_subaccount_mining_summary": (
+        "getMiningSummary",
+        lambda n: luxor.build_get_subaccount_mining_summary("sub", "BTC", "_1_HOUR"),
+        False,
+    ),
+    "resolve_get_subaccount_hashrate_history": (
+        "getHashrateHistory",
+        lambda n: luxor.build_get_subaccount_hashrate_history(
+            "sub",
+            "BTC",
+            "_1_HOUR",
+            n,
+        ),
+        True,
+    ),
+    "resolve_get_worker_details": (
+        "miners",
+        lambda n: luxor.build_get_worker_details_1H("sub", "BTC", n),
+        True,
+    ),
+    "resolve_get_unrestricted_worker_details": (
+        "getWorkerDetails",
+        lambda n: luxor.build_get_worker_details("sub", "BTC", 60, n),
+        True,
+    ),
+    "resolve_get_worker_hashrate_history": (
+        "getWorkerHashrateHistory",
+        lambda n: luxor.build_get_worker_hashrate_history(
+            "sub",
+            "worker",
+            "BTC",
+            "_15_MINUTE",
+            "_1_DAY",
+            n,
+        ),
+        True,
+    ),
+    "resolve_get_profile_active_worker_count": ("getProfileActiveWorkers", None, False),
+    "resolve_get_profile_inactive_worker_count": (
+        "getProfileInactiveWorkers",
+        lambda n: luxor.build_get_profile_inactive_worker_count("BTC"),
+        False,
+    ),
+    "resolve_get_transaction_history": (
+        "getAllTransactionHistory",
+        lambda n: luxor.build_get_all_transaction_history("BTC", "sub", n),
+        True,
+    ),
+    "resolve_get_hashrate_score_history": (
+        "getHashrateScoreHistory",
+        lambda n: luxor.build_get_hashrate_score_history("sub", "BTC", n),
+        True,
+    ),
+    "resolve_get_revenue_ph": (
+        "getRevenuePh",
+        lambda n: luxor.build_get_revenue_ph("BTC"),
+        False,
+    ),
+}
+
+
+def _runs(size: int, repeat: int) -> int:
+    # fewer runs for the largest payloads, at least 3 to get a median
+    return max(3, min(repeat, 100_000 // max(size, 1)))
+
+
+def _peak(function: Callable[[], Any]) -> float:
+    """
+    Peak memory allocated while calling `function`, in MB.
+    """
+
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def measure(function: Callable[[], Any], runs: int, edges: int) -> dict[str, Any]:
+    """
+    Latency percentiles, throughput and peak memory of `function`, after one warm-up call.
+    """
+
+    function()
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    median = statistics.median(latencies)
+
+    return {
+        "runs": runs,
+        "latency_ms": {
+            "min": latencies[0] * 1e3,
+            "median": median * 1e3,
+            "p95": latencies[min(runs - 1, int(0.95 * runs))] * 1e3,
+        },
+        "calls_per_second": 1 / median if median else None,
+        "edges_per_second": edges / median if median else None,
+        "peak_memory_mb": _peak(function),
+    }
+
+
+def run(
+    sizes: list[int],
+    repeat: int,
+    latency: float,
+    modes: list[str],
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+
+    with MockServer(latency=latency) as server, GraphQlClient(
+        server.url,
+        "key",
+        "POST",
+        retry=None,
+    ) as client:
+        for method, (payload, builder, sized) in TARGETS.items():
+            for size in sizes if sized else sizes[:1]:
+                edges = size if sized else 1
+                runs = _runs(edges, repeat)
+
+                if builder is not None:
+                    query, params = builder(size)
+                    results.append(
+                        {
+                            "target": "request",
+                            "operation": payload,
+                            "mode": None,
+                            "edges": edges,
+                            **measure(
+                                partial(client.request, query, params, render=False),
+                                runs,
+                                edges,
+                            ),
+                        },
+                    )
+                    response = client.request(query, params, render=False)
+                else:
+                    response = PAYLOADS[payload](size)
+
+                for mode in modes:
+                    resolver = getattr(
+                        RESOLVERS(df=mode == "df", arrow=mode == "arrow"),
+                        method,
+                    )
+                    results.append(
+                        {
+                            "target": method,
+                            "operation": payload,
+                            "mode": mode,
+                            "edges": edges,
+                            **measure(partial(resolver, response), runs, edges),
+                        },
+                    )
+                print(f"{method} {edges} edges", file=sys.stderr)
+    return results
+
+
+def _key(row: dict[str, Any]) -> tuple[Any, ...]:
+    return row["target"], row["operation"], row["mode"], row["edges"]
+
+
+def compare(
+    results: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    threshold: float,
+) -> list[str]:
+    """
+    Prints the ratio of every median latency and peak memory to the baseline and
+    returns the measurements more than `threshold` (e.g. 0.2 for 20%) worse.
+    """
+
+    previous = {_key(row): row for row in baseline}
+    regressions = []
+
+    print(f"\n{'target':<44} {'mode':<7} {'edges':>7} {'latency':>9} {'memory':>9}")
+    for row in results:
+        before = previous.get(_key(row))
+        if before is None:
+            continue
+        ratios = {
+            "latency": row["latency_ms"]["median"] / before["latency_ms"]["median"],
+            "memory": row["peak_memory_mb"] / before["peak_memory_mb"]
+            if before["peak_memory_mb"]
+            else 1.0,
+        }
+        name = (
+            row["target"]
+            if row["target"] != "request"
+            else f"request {row['operation']}"
+        )
+        print(
+            f"{name:<44} {row['mode'] or '':<7} {row['edges']:>7} "
+            f"{ratios['latency']:>8.2f}x {ratios['memory']:>8.2f}x",
+        )
+        for metric, ratio in ratios.items():
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{name} {row['mode'] or ''} {row['edges']}: {metric} {ratio:.2f}x",
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10_000, 100_000],
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="mock server latency",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["list", "df", "arrow"] if pa is not None else ["list", "df"],
+        help="RESOLVERS outputs benchmarked",
+    )
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="results of a previous run to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="slowdown reported as a regression by --compare",
+    )
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.latency_ms / 1e3, args.modes)
+
+    print(
+        f"{'target':<44} {'mode':<7} {'edges':>7} {'median ms':>10} "
+        f"{'p95 ms':>9} {'edges/s':>12} {'peak MB':>9}",
+    )
+    for row in results:
+        name = (
+            row["target"]
+            if row["target"] != "request"
+            else f"request {row['operation']}"
+        )
+        print(
+            f"{name:<44} {row['mode'] or '':<7} {row['edges']:>7} "
+            f"{row['latency_ms']['median']:>10.3f} {row['latency_ms']['p95']:>9.3f} "
+            f"{row['edges_per_second'] or 0:>12.0f} {row['peak_memory_mb']:>9.2f}",
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            sys.exit("Regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
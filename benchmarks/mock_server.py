@@ -0,0 +1,209 @@
+"""
+Local stand-in for Luxor's GraphQL API, replaying the synthetic payloads of
+`payloads.py` so the client can be benchmarked offline.
+
+The payload is picked from the root field of the query and holds as many
+edges as its `first` variable asks for (`--size` when it has none). Batched
+documents get one payload per root field, under its `opN_` alias. Every
+answer is delayed by `--latency-ms`, plus up to `--jitter-ms` at random.
+
+    python benchmarks/mock_server.py --port 8000 --latency-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document import root_fields  # noqa: E402
+from payloads import PAYLOADS  # noqa: E402
+from payloads import transactions  # noqa: E402
+
+# root fields answered with the payload of another one
+ALIASES = {
+    "getTransactionHistory": lambda n: transactions(n, "getTransactionHistory"),
+}
+
+
+# alias prefix of the root fields of a batched document, see `batching.batch_calls`
+BATCH_ALIAS = re.compile(r"op\d+_")
+
+
+@lru_cache(maxsize=64)
+def _data(field: str, size: int) -> Any:
+    generate = ALIASES.get(field) or PAYLOADS[field]
+    return generate(size)["data"][field]
+
+
+@lru_cache(maxsize=64)
+def _payload(field: str, size: int) -> bytes:
+    return json.dumps({"data": {field: _data(field, size)}}).encode("utf-8")
+
+
+def _errors(message: str, code: str) -> bytes:
+    return json.dumps(
+        {"data": None, "errors": [{"message": message, "extensions": {"code": code}}]},
+    ).encode("utf-8")
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: MockHTTPServer
+    protocol_version = "HTTP/1.1"
+    # headers and body are sent apart, Nagle would hold the body back ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        query = body.get("query")
+        variables = body.get("variables") or {}
+
+        if query is None:
+            content = _errors("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+        else:
+            content = self._answer(root_fields(query), variables)
+
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _answer(self, keys: list[str], variables: dict[str, Any]) -> bytes:
+        data = {}
+        for key in keys:
+            # a batched field and its variables share the alias prefix
+            alias = BATCH_ALIAS.match(key)
+            prefix = "" if alias is None else alias.group()
+            field = key[len(prefix) :]
+            if field not in PAYLOADS and field not in ALIASES:
+                return _errors(f"Unknown field {field}", "GRAPHQL_VALIDATION_FAILED")
+            size = variables.get(f"{prefix}first") or self.server.size
+            if len(keys) == 1 and alias is None:
+                return _payload(field, size)
+            data[key] = _data(field, size)
+        return json.dumps({"data": data}).encode("utf-8")
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        size: int = 100,
+    ):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.size = size
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # clients hang up on purpose, e.g. cancelled hedged requests
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/graphql"
+
+
+class MockServer:
+    """
+    Runs the mock server in a child process, so it does not compete with the
+    benchmarked client for the GIL or show up in its memory measurements.
+
+        with MockServer(latency=0.02) as server:
+            client = GraphQlClient(server.url, "key", "POST")
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, size: int = 100):
+        self.latency = latency
+        self.jitter = jitter
+        self.size = size
+        self.url = ""
+        self._process: subprocess.Popen[str] | None = None
+
+    def __enter__(self) -> MockServer:
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--port",
+                "0",
+                "--latency-ms",
+                str(self.latency * 1e3),
+                "--jitter-ms",
+                str(self.jitter * 1e3),
+                "--size",
+                str(self.size),
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        # the child prints its URL once it accepts connections
+        self.url = self._process.stdout.readline().strip()  # type: ignore
+        if not self.url:
+            raise RuntimeError("The mock server did not start")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=100,
+        help="edges when `first` is not set",
+    )
+    args = parser.parse_args()
+
+    server = MockHTTPServer(
+        args.port,
+        args.latency_ms / 1e3,
+        args.jitter_ms / 1e3,
+        args.size,
+    )
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
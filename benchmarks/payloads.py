@@ -0,0 +1,214 @@
+"""
+Synthetic responses shaped like Luxor's GraphQL API, used by the benchmarks.
+Every generator takes the number of edges/nodes to produce.
+"""
+from __future__ import annotations
+
+import random
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from typing import Callable
+
+_START = datetime(2022, 11, 1, tzinfo=timezone.utc)
+_STATUSES = ("Active", "Warning", "Dead")
+
+
+def _connection(
+    operation: str,
+    nodes: list[dict[str, Any]],
+    items: str = "edges",
+) -> dict[str, Any]:
+    page_info = {"hasNextPage": False, "endCursor": None}
+    if items == "nodes":
+        return {"data": {operation: {"pageInfo": page_info, "nodes": nodes}}}
+    return {
+        "data": {
+            operation: {
+                "pageInfo": page_info,
+                "edges": [{"node": node} for node in nodes],
+            },
+        },
+    }
+
+
+def _timestamp(minutes: int) -> str:
+    return (_START + timedelta(minutes=minutes)).isoformat().replace("+00:00", "Z")
+
+
+def _hashrate(rng: random.Random) -> str:
+    # Hashrates are big integers serialized as strings (H/s)
+    return str(rng.randint(80, 120) * 10**12 + rng.randint(0, 10**12))
+
+
+def _shares(rng: random.Random) -> dict[str, Any]:
+    return {
+        "validShares": str(rng.randint(10**4, 10**6)),
+        "staleShares": str(rng.randint(0, 100)),
+        "badShares": str(rng.randint(0, 10)),
+        "duplicateShares": str(rng.randint(0, 10)),
+        "invalidShares": str(rng.randint(0, 10)),
+        "lowDiffShares": str(rng.randint(0, 100)),
+    }
+
+
+def worker_details(n: int, seed: int = 0) -> dict[str, Any]:
+    rng = random.Random(seed)
+    nodes = [
+        {
+            "workerName": f"worker{i:06d}",
+            "hashrate": _hashrate(rng),
+            **_shares(rng),
+            "efficiency": round(rng.uniform(0.95, 1.0), 6),
+            "revenue": f"{rng.uniform(0.0001, 0.001):.8f}",
+            "status": rng.choice(_STATUSES),
+            "updatedAt": _timestamp(i % 1440),
+        }
+        for i in range(n)
+    ]
+    return _connection("getWorkerDetails", nodes)
+
+
+def workers_overview(
+    n: int,
+    details: str = "details1H",
+    seed: int = 0,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    nodes = [
+        {
+            "workerName": f"worker{i:06d}",
+            details: {
+                "hashrate": _hashrate(rng),
+                "status": rng.choice(_STATUSES),
+                "efficiency": round(rng.uniform(0.95, 1.0), 6),
+                **_shares(rng),
+            },
+        }
+        for i in range(n)
+    ]
+    return _connection("miners", nodes)
+
+
+def hashrate_history(
+    n: int,
+    operation: str = "getHashrateHistory",
+    seed: int = 0,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    nodes = [{"time": _timestamp(15 * i), "hashrate": _hashrate(rng)} for i in range(n)]
+    return _connection(operation, nodes)
+
+
+def worker_hashrate_history(n: int, seed: int = 0) -> dict[str, Any]:
+    return hashrate_history(n, "getWorkerHashrateHistory", seed)
+
+
+def transactions(
+    n: int,
+    operation: str = "getAllTransactionHistory",
+    seed: int = 0,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    nodes = [
+        {
+            "transactionId": f"{rng.getrandbits(256):064x}",
+            "amount": f"{rng.uniform(0.001, 0.1):.8f}",
+            "status": rng.choice(("CONFIRMED", "PENDING")),
+            "payoutAddress": f"bc1q{rng.getrandbits(160):040x}",
+            "currency": "BTC",
+            "createdAt": _timestamp(1440 * i),
+        }
+        for i in range(n)
+    ]
+    return _connection(operation, nodes)
+
+
+def hashrate_score_history(n: int, seed: int = 0) -> dict[str, Any]:
+    rng = random.Random(seed)
+    nodes = [
+        {
+            "date": (_START - timedelta(days=i)).date().isoformat(),
+            "hashrate": _hashrate(rng),
+            "efficiency": round(rng.uniform(0.95, 1.0), 6),
+            "revenue": f"{rng.uniform(0.001, 0.01):.8f}",
+        }
+        for i in range(n)
+    ]
+    return _connection("getHashrateScoreHistory", nodes, items="nodes")
+
+
+def subaccounts(n: int, seed: int = 0) -> dict[str, Any]:
+    return _connection("users", [{"username": f"subaccount{i:05d}"} for i in range(n)])
+
+
+def mining_summary(n: int = 1, seed: int = 0) -> dict[str, Any]:
+    rng = random.Random(seed)
+    shares = _shares(rng)
+    return {
+        "data": {
+            "getMiningSummary": {
+                "hashrate": _hashrate(rng),
+                "validShares": shares["validShares"],
+                "invalidShares": shares["invalidShares"],
+                "staleShares": shares["staleShares"],
+                "badShares": shares["badShares"],
+                "lowDiffShares": shares["lowDiffShares"],
+                "revenue": f"{rng.uniform(0.001, 0.01):.8f}",
+            },
+        },
+    }
+
+
+def revenue_ph(n: int = 1, seed: int = 0) -> dict[str, Any]:
+    return {"data": {"getRevenuePh": 0.0752}}
+
+
+def workers_status_count(n: int = 1, seed: int = 0) -> dict[str, Any]:
+    rng = random.Random(seed)
+    dead, warning = rng.randint(0, 16), rng.randint(0, 16)
+    return {
+        "data": {
+            "getUserMinersStatusCount": {
+                "dead": dead,
+                "warning": warning,
+                "active": 1024 - dead - warning,
+            },
+        },
+    }
+
+
+def pool_hashrate(n: int = 1, seed: int = 0) -> dict[str, Any]:
+    return {"data": {"getPoolHashrate": _hashrate(random.Random(seed))}}
+
+
+def revenue(n: int = 1, seed: int = 0) -> dict[str, Any]:
+    return {"data": {"getRevenue": f"{random.Random(seed).uniform(0.1, 1):.8f}"}}
+
+
+def profile_active_workers(n: int = 1, seed: int = 0) -> dict[str, Any]:
+    return {"data": {"getProfileActiveWorkers": 1024}}
+
+
+def profile_inactive_workers(n: int = 1, seed: int = 0) -> dict[str, Any]:
+    return {"data": {"getProfileInactiveWorkers": 12}}
+
+
+# root field -> payload generator
+PAYLOADS: dict[str, Callable[[int], dict[str, Any]]] = {
+    "getWorkerDetails": worker_details,
+    "miners": workers_overview,
+    "getHashrateHistory": hashrate_history,
+    "getWorkerHashrateHistory": worker_hashrate_history,
+    "getAllTransactionHistory": transactions,
+    "getHashrateScoreHistory": hashrate_score_history,
+    "users": subaccounts,
+    "getMiningSummary": mining_summary,
+    "getRevenuePh": revenue_ph,
+    "getProfileActiveWorkers": profile_active_workers,
+    "getProfileInactiveWorkers": profile_inactive_workers,
+    "getUserMinersStatusCount": workers_status_count,
+    "getPoolHashrate": pool_hashrate,
+    "getRevenue": revenue,
+}
@@ -2,22 +2,343 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from functools import lru_cache
+from itertools import islice
+from types import TracebackType
 from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import NamedTuple
+from typing import TYPE_CHECKING
+from typing import TypeVar
 
-import requests
-from rich import print
-from rich import print_json
-from rich.console import Console
-from rich.table import Table
+from batching import Batch
+from batching import batch_calls
+from batching import Call
+from coalesce import SingleFlight
+from codec import Codec
+from codec import get_codec
+from document import minify
+from document import operation_name
+from document import operation_type
+from document import root_fields
+from exceptions import DeadlineExceeded
+from exceptions import GraphQlHTTPError
+from exceptions import GraphQlResponseError
+from logs import log_request
+from metrics import pop_connect
+from metrics import RequestTiming
+from metrics import timed_adapter
+from metrics import trace_config
+from retry import parse_retry_after
+from retry import RetryPolicy
+from retry import TokenBucket
+from timeouts import Deadline
+from timeouts import LatencyWindow
+from timeouts import split_timeout
+from timeouts import Timeout
 
+if TYPE_CHECKING:
+    import asyncio
+
+    import aiohttp
+    import requests
+
+T = TypeVar("T")
+
+
+def _connection(
+    json_response: dict[str, Any],
+    operation: str | None = None,
+) -> dict[str, Any]:
+    """
+    Returns the connection object (the one holding `edges`/`nodes` and `pageInfo`)
+    of a response. Defaults to the first operation of the response.
+    """
+
+    data: dict[str, Any] = json_response["data"]
+    if operation is None:
+        operation = list(data.keys())[0]
+    connection: dict[str, Any] = data[operation]
+    return connection
+
+
+def _next_cursor(connection: dict[str, Any]) -> str | None:
+    """
+    Returns the cursor of the next page, or None if the connection is exhausted.
+    """
+
+    page_info: dict[str, Any] | None = connection.get("pageInfo")
+    if page_info is None:
+        raise ValueError(
+            "Paginated queries must select `pageInfo { hasNextPage endCursor }`",
+        )
+    if not page_info.get("hasNextPage"):
+        return None
+    cursor: str | None = page_info.get("endCursor")
+    return cursor
+
+
+def _page_params(
+    params: dict[str, Any] | None,
+    cursor: str | None,
+    page_size: int | None,
+) -> dict[str, Any]:
+    page_params = dict(params or {})
+    page_params["after"] = cursor
+    if page_size is not None:
+        page_params["first"] = page_size
+    return page_params
+
+
+def _connection_items(connection: dict[str, Any]) -> list[dict[str, Any]]:
+    items: list[dict[str, Any]] = (
+        connection.get("edges") or connection.get("nodes") or []
+    )
+    return items
+
+
+def _discard(future: Future[requests.Response]) -> None:
+    """
+    Releases the connection of a hedged attempt that lost the race.
+    """
+
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _read_before(response: requests.Response, deadline: Deadline) -> bytes:
+    """
+    Returns the body of a streamed response, hanging up on the server if it is
+    still coming when the deadline expires: the read timeout only bounds every
+    read from the socket, a body trickling in would outlast it.
+    """
+
+    import socket
+
+    import requests
+
+    sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+    if sock is None:
+        return response.content
+
+    expired = threading.Event()
+
+    def hang_up() -> None:
+        expired.set()
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    watchdog = threading.Timer(deadline.remaining(), hang_up)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        content = response.content
+    except requests.RequestException as error:
+        if expired.is_set():
+            raise DeadlineExceeded(deadline.seconds) from error
+        raise
+    finally:
+        watchdog.cancel()
+    # a body cut short by the hang up may read as complete
+    if expired.is_set():
+        response.close()
+        raise DeadlineExceeded(deadline.seconds)
+    return content
+
+
+class CallResult(NamedTuple):
+    """
+    Outcome of one call of `GraphQlClient.request_many`.
+
+    position : position of the call in the input.
+    query : GraphQL query of the call.
+    params : parameters of the call.
+    result : JSON response, None if the call failed.
+    error : exception raised by the call, None if it succeeded.
+    """
+
+    position: int
+    query: str
+    params: dict[str, Any] | None
+    result: dict[str, Any] | None
+    error: BaseException | None
+
+
+@lru_cache(maxsize=256)
+def _describe(query: str) -> tuple[str, str | None, str]:
+    """
+    Returns the normalized text, name and type of a query. Memoized because the
+    same handful of queries is sent over and over.
+    """
+
+    return minify(query), operation_name(query), operation_type(query)
+
+
+def _key(query: str, params: dict[str, Any] | None) -> str:
+    """
+    Identifies a call: the normalized query text and the canonical JSON of its variables.
+    """
+
+    variables = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return _describe(query)[0] + "\n" + variables
+
+
+class ResponseCache:
+    """
+    In-memory TTL + LRU cache of GraphQL responses, keyed on the normalized query
+    text and the canonical JSON of its variables. Only queries are cached.
+
+    Cached responses are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_size: int = 1024,
+        ttls: dict[str, float] | None = None,
+    ):
+        """
+        Parameters
+        ----------
+
+        ttl : float
+            Seconds a response is served from the cache. Default is 60.
+
+        max_size : int
+            Maximum number of responses kept, the least recently used are evicted first. Default is 1024.
+
+        ttls : dictionary
+            Per-operation TTL overrides, e.g. `{"getRevenuePh": 300, "getWorkerDetails": 0}`.
+            A TTL of 0 disables caching for that operation.
+        """
+
+        self.ttl = ttl
+        self.max_size = max_size
+        self.ttls = ttls or {}
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[
+            str,
+            tuple[float, str | None, dict[str, Any]],
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, query: str, params: dict[str, Any] | None) -> str:
+        return _key(query, params)
+
+    def get(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+    ) -> dict[str, Any] | None:
+        """
+        Returns the cached response, or None if it is missing or expired.
+        """
+
+        key = self.key(query, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        json_response: dict[str, Any],
+    ) -> None:
+        _, name, kind = _describe(query)
+        ttl = self.ttls.get(name, self.ttl) if name is not None else self.ttl
+        if kind != "query" or ttl <= 0 or json_response.get("errors"):
+            return
+
+        key = self.key(query, params)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, name, json_response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(
+        self,
+        operation: str | None = None,
+        query: str | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> int:
+        """
+        Drops cached responses and returns how many were removed.
+
+        operation (str): drop every response of this operation, e.g. `getRevenuePh`.
+        query (str): drop the response of this exact query and `params`.
+        Without arguments the whole cache is cleared.
+        """
+
+        with self._lock:
+            if query is not None:
+                return 1 if self._entries.pop(self.key(query, params), None) else 0
+
+            if operation is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+
+            keys = [k for k, entry in self._entries.items() if entry[1] == operation]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class _BaseGraphQlClient:
+    """
+    Options and behaviour shared by `GraphQlClient` and `AsyncGraphQlClient`,
+    which only add the settings of their connection pools.
+    """
 
-class GraphQlClient:
     def __init__(
         self,
         host: str,
         key: str,
         method: str,
         verbose: bool = False,
+        cache: ResponseCache | None = None,
+        sink: Callable[[dict[str, Any]], None] | None = None,
+        codec: Codec | None = None,
+        retry: RetryPolicy | None = RetryPolicy(),
+        rate_limiter: TokenBucket | None = None,
+        timeout: Timeout = (10.0, 60.0),
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        persisted_queries: bool = False,
+        coalesce: bool = False,
+        metrics: Callable[[RequestTiming], None] | None = None,
     ):
         """
         Parameters
@@ -33,91 +354,1454 @@ class GraphQlClient:
             API request METHOD. Default is `POST`.
 
         verbose : boolean
-            Boolean flag that controls if API querys are logged.
+            Boolean flag that controls if a structured record of every call (operation,
+            variables hash, status, duration and sizes) is logged, see `logs.py`.
+
+        cache : ResponseCache
+            Optional response cache consulted before every request. Default is `None`.
+
+        sink : callable
+            Optional callable receiving every response, e.g. `render.TableRenderer()` to
+            print results as tables. Default is `None`, nothing is rendered.
+
+        codec : Codec
+            JSON backend used for request bodies and responses. Default is the fastest
+            one installed, see `codec.get_codec`.
+
+        retry : RetryPolicy
+            When to retry failed requests (429, 5xx and connection errors by default)
+            and how long to wait in between. `None` disables retries.
+
+        rate_limiter : TokenBucket
+            Optional limiter every request waits on, share one between clients to
+            keep them all under the API quota. Default is `None`.
+
+        timeout : float or (float, float)
+            Connect and read timeouts in seconds, a single number for both. Can be
+            overridden per call. `None` waits forever. Default is (10, 60).
+
+        hedge : boolean
+            Boolean flag that enables hedged queries: if an attempt has not answered
+            within the observed `hedge_quantile` latency, a duplicate is sent and the
+            first answer wins. Mutations are never hedged. Default is `False`.
+
+        hedge_quantile : float
+            Latency quantile after which a query is hedged. Default is 0.95.
+
+        persisted_queries : boolean
+            Boolean flag that enables Automatic Persisted Queries: only the sha256 hash
+            of the query is sent, and the full text only when the API does not know
+            the hash yet. Default is `False`.
+
+        coalesce : boolean
+            Boolean flag that coalesces identical queries (same text and variables)
+            sent concurrently: they share one request and its parsed response, which
+            callers must not mutate. Default is `False`.
+
+        metrics : callable
+            Optional callable receiving the `metrics.RequestTiming` of every call:
+            connect, time to first byte, download, decode and render durations, and
+            bytes sent and received. E.g. `metrics.Metrics()` to aggregate them into
+            histograms. Default is `None`, nothing is measured.
         """
 
         self.host = host
         self.key = key
         self.method = method
         self.verbose = verbose
+        self.cache = cache
+        self.sink = sink
+        self.codec = codec or get_codec()
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.persisted_queries = persisted_queries
+        self.flights = SingleFlight() if coalesce else None
+        self.metrics = metrics
+        self.latency = LatencyWindow()
 
-    def print_graphql_result(self, json_result: dict[str, Any]) -> None:
-        try:
-            data: dict[str, Any] = json_result["data"]
-            # Obtain the first key, usually the graphql operation
-            graphql_operation: str = list(data.keys())[0]
-            result: dict[str, Any] = data[graphql_operation]
-            edges: list[dict[str, Any]] | None = result.get("edges")
-
-            if edges is None or len(edges) == 0:
-                print_json(data=result)
-                return
-
-            table = Table(
-                show_header=True,
-                header_style="yellow",
-                show_lines=True,
-                title=f"Result: {graphql_operation}",
-                title_style="bold yellow",
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "x-lux-api-key": f"{self.key}",
+        }
+
+    def _encode(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        hash_only: bool = False,
+    ) -> bytes:
+        body: dict[str, Any] = {"query": query, "variables": params}
+        if self.persisted_queries:
+            from queries import persisted_hash
+
+            body["extensions"] = {
+                "persistedQuery": {"version": 1, "sha256Hash": persisted_hash(query)},
+            }
+            if hash_only:
+                del body["query"]
+        return self.codec.dumps(body)
+
+    def _persisted_query_missing(self, error: GraphQlResponseError) -> bool:
+        """
+        Returns True if a hash-only request failed because the API needs the query
+        text: the hash is not registered yet, or persisted queries are not supported
+        at all, in which case they are turned off for this client.
+        """
+
+        codes = set(error.codes)
+        messages = {e.get("message") for e in error.errors}
+        if (
+            "PERSISTED_QUERY_NOT_SUPPORTED" in codes
+            or "PersistedQueryNotSupported" in messages
+        ):
+            self.persisted_queries = False
+            return True
+        return (
+            "PERSISTED_QUERY_NOT_FOUND" in codes or "PersistedQueryNotFound" in messages
+        )
+
+    def _raise_for_status(
+        self,
+        status: int,
+        reason: str | None,
+        content: bytes,
+        retry_after: str | None = None,
+    ) -> None:
+        if status != 200:
+            raise GraphQlHTTPError(
+                status,
+                reason,
+                content,
+                parse_retry_after(retry_after),
+            )
+
+    def _decode(
+        self,
+        content: bytes,
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        start = time.perf_counter()
+        json_response: dict[str, Any] = self.codec.loads(content)
+        if timing is not None:
+            timing.phases["decode"] = time.perf_counter() - start
+        if json_response.get("data") is None and json_response.get("errors"):
+            raise GraphQlResponseError(json_response["errors"])
+        return json_response
+
+    def _coalesced(self, query: str) -> bool:
+        return self.flights is not None and _describe(query)[2] == "query"
+
+    def _hedge_after(self, query: str) -> float | None:
+        """
+        Returns the seconds after which a duplicate of the query is sent, or None
+        if it must not be hedged.
+        """
+
+        if not self.hedge or _describe(query)[2] != "query":
+            return None
+        return self.latency.percentile(self.hedge_quantile)
+
+    def _retry_delay(
+        self,
+        query: str,
+        error: BaseException,
+        attempt: int,
+        transient: tuple[type[BaseException], ...],
+        deadline: Deadline | None = None,
+    ) -> float | None:
+        """
+        Returns the seconds to wait before retrying a failed attempt, or None to raise.
+        A 429 answer also pauses the shared rate limiter for every other caller.
+        Raises DeadlineExceeded if the call deadline expires before the retry.
+        """
+
+        if self.retry is None:
+            return None
+
+        mutation = _describe(query)[2] == "mutation"
+        delay = self.retry.next_delay(error, attempt, transient, mutation)
+        if delay is not None and deadline is not None and delay >= deadline.remaining():
+            raise DeadlineExceeded(deadline.seconds) from error
+        if delay is not None:
+            logging.warning(
+                "Retrying %s in %.2fs after: %s",
+                _describe(query)[1] or "operation",
+                delay,
+                error,
             )
+            if (
+                self.rate_limiter is not None
+                and isinstance(error, GraphQlHTTPError)
+                and error.status == 429
+            ):
+                self.rate_limiter.pause(delay)
+        return delay
 
-            # Get the columns for the result based on a sample of the result
-            sample = edges[0]["node"]
-            columns = list(sample.keys())
+    def _render(
+        self,
+        json_response: dict[str, Any],
+        render: bool,
+        timing: RequestTiming | None = None,
+    ) -> None:
+        if render and self.sink is not None:
+            start = time.perf_counter()
+            self.sink(json_response)
+            if timing is not None:
+                timing.phases["render"] = time.perf_counter() - start
 
-            for column_name in columns:
-                table.add_column(column_name)
+    def _timing(
+        self,
+        query: str,
+        operation: str | None = None,
+    ) -> RequestTiming | None:
+        if self.metrics is None and not self.verbose:
+            return None
+        return RequestTiming(operation or _describe(query)[1] or "operation")
 
-            for row in edges:
-                values = [row["node"][column] for column in columns]
-                table.add_row(*values)
+    def _report(
+        self,
+        timing: RequestTiming | None,
+        params: dict[str, Any] | None,
+        status: str = "ok",
+    ) -> None:
+        if timing is None:
+            return
+        timing.finish(status)
+        if self.verbose:
+            log_request(timing, params)
+        if self.metrics is not None:
+            self.metrics(timing)
 
-            console = Console()
-            console.print(table)
+    def print_graphql_result(self, json_result: dict[str, Any]) -> None:
+        """
+        Prints a result as a table, regardless of the configured `sink`.
+        """
 
-        except Exception:
-            print(json_result)
+        from render import TableRenderer
+
+        TableRenderer()(json_result)
+
+
+class GraphQlClient(_BaseGraphQlClient):
+    def __init__(
+        self,
+        host: str,
+        key: str,
+        method: str,
+        *args: Any,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        **options: Any,
+    ):
+        """
+        Takes the `host`, `key`, `method` and options of `_BaseGraphQlClient`, plus:
+
+        Parameters
+        ----------
+
+        pool_connections : int
+            Number of per-host connection pools to cache. Default is 10.
+
+        pool_maxsize : int
+            Maximum number of connections kept alive per host. Default is 10.
+
+        pool_block : boolean
+            Boolean flag that makes requests wait for a free connection instead of
+            opening an extra one when a host pool is exhausted. Default is `False`.
+
+        keep_alive : boolean
+            Boolean flag that controls if connections are reused between requests.
+            Default is `True`.
+        """
+
+        super().__init__(host, key, method, *args, **options)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+
+        self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._hedger: ThreadPoolExecutor | None = None
+        self._many: ThreadPoolExecutor | None = None
+        self._many_workers = 0
+
+    def __enter__(self) -> GraphQlClient:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Long-lived session shared by every request made through this client.
+        Created on first use so the connection pool is only opened when needed.
+        """
+
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        session.headers.update(self.headers)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+
+        adapter_class: type[HTTPAdapter] = HTTPAdapter
+        if self.metrics is not None:
+            # measures the connections it opens, see `metrics.pop_connect`
+            adapter_class = timed_adapter()
+        adapter = adapter_class(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Background workers owned by the client, used to overlap requests
+        (e.g. prefetching the next page). Sized after the connection pool.
+        """
+
+        if self._executor is None:
+            with self._session_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.pool_maxsize,
+                        thread_name_prefix="graphql-client",
+                    )
+        return self._executor
+
+    @property
+    def hedger(self) -> ThreadPoolExecutor:
+        """
+        Workers sending hedged attempts. Kept apart from `executor` so a prefetch
+        running there never waits on a hedge queued behind it.
+        """
+
+        if self._hedger is None:
+            with self._session_lock:
+                if self._hedger is None:
+                    self._hedger = ThreadPoolExecutor(
+                        max_workers=self.pool_maxsize * 2,
+                        thread_name_prefix="graphql-hedge",
+                    )
+        return self._hedger
+
+    def _many_executor(self, max_workers: int) -> ThreadPoolExecutor:
+        """
+        Workers of `request_many`, kept between calls. Replaced by a larger pool when
+        a call asks for more workers, the previous one exits once its calls are done.
+        """
+
+        if self._many is None or self._many_workers < max_workers:
+            with self._session_lock:
+                if self._many is None or self._many_workers < max_workers:
+                    if self._many is not None:
+                        self._many.shutdown(wait=False)
+                    self._many = ThreadPoolExecutor(
+                        max_workers=max_workers,
+                        thread_name_prefix="graphql-many",
+                    )
+                    self._many_workers = max_workers
+        return self._many
+
+    def close(self) -> None:
+        """
+        Closes the underlying session and every pooled connection.
+        The client can still be used afterwards, a new pool is opened on demand.
+        """
+
+        with self._session_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            if self._hedger is not None:
+                self._hedger.shutdown(wait=True)
+                self._hedger = None
+            if self._many is not None:
+                self._many.shutdown(wait=True)
+                self._many = None
+                self._many_workers = 0
+            if self._session is not None:
+                self._session.close()
+                self._session = None
 
     def request(
         self,
         query: str,
         params: dict[str, Any] | None = None,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
     ) -> dict[str, Any]:
         """
         Base function to execute operations against Luxor's GraphQL API
 
         query (str): GraphQL compliant query string.
         params (dictionary): dictionary containing the query parameters, values depend on query.
+        render (bool): hand the response to the client `sink`, if any.
+        timeout (float or tuple): connect and read timeouts of this call, overriding the client ones.
+        deadline (Deadline or float): overall time budget in seconds, shared by all retries.
         """
 
-        headers = {
-            "Content-Type": "application/json",
-            "x-lux-api-key": f"{self.key}",
-        }
+        timing = self._timing(query)
+        status = "ok"
+        try:
+            json_response = (
+                self.cache.get(query, params) if self.cache is not None else None
+            )
+            if json_response is not None:
+                status = "cached"
+            elif self.flights is not None and self._coalesced(query):
+                deadline = Deadline.of(deadline)
+                json_response = self.flights.do(
+                    _key(query, params),
+                    lambda: self._fetch(query, params, timeout, deadline, timing),
+                    deadline,
+                )
+            else:
+                json_response = self._fetch(query, params, timeout, deadline, timing)
 
-        s = requests.Session()
-        s.headers = headers  # type: ignore
+            self._render(json_response, render, timing)
+        except BaseException as error:
+            self._report(timing, params, type(error).__name__)
+            raise
+        self._report(timing, params, status)
+        return json_response
 
-        if self.verbose:
-            logging.info(query)
+    def _fetch(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        timeout: Timeout,
+        deadline: Deadline | float | None,
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        json_response = self._execute(query, params, timeout, deadline, timing)
+        if self.cache is not None:
+            self.cache.put(query, params, json_response)
+        return json_response
+
+    def _execute(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        deadline = Deadline.of(deadline)
+        if self.persisted_queries:
+            try:
+                response = self._send(
+                    query,
+                    params,
+                    timeout=timeout,
+                    deadline=deadline,
+                    hash_only=True,
+                    timing=timing,
+                )
+                return self._decode(response.content, timing)
+            except GraphQlResponseError as error:
+                if not self._persisted_query_missing(error):
+                    raise
+
+        response = self._send(
+            query,
+            params,
+            timeout=timeout,
+            deadline=deadline,
+            timing=timing,
+        )
+        return self._decode(response.content, timing)
 
-        response = s.request(
+    def _send(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        stream: bool = False,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+        hash_only: bool = False,
+        timing: RequestTiming | None = None,
+    ) -> requests.Response:
+        """
+        Sends the operation until it gets a 200 answer, waiting on the rate limiter
+        before every attempt and retrying failures as allowed by the retry policy.
+        Every attempt gets the call timeouts, capped to the time left before the deadline,
+        and its response body is abandoned once the deadline expires.
+        """
+
+        import requests
+
+        body = self._encode(query, params, hash_only)
+        transient = (requests.ConnectionError, requests.Timeout)
+        deadline = Deadline.of(deadline)
+        timeout = self.timeout if timeout is None else timeout
+        hedge_after = None if stream else self._hedge_after(query)
+
+        attempt = 0
+        while True:
+            if deadline is not None:
+                deadline.check()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                attempt_timeout = (
+                    split_timeout(timeout)
+                    if deadline is None
+                    else deadline.clamp(timeout)
+                )
+                if hedge_after is None:
+                    return self._post(body, attempt_timeout, stream, timing, deadline)
+                return self._hedged(
+                    body,
+                    attempt_timeout,
+                    hedge_after,
+                    timing,
+                    deadline,
+                )
+            except Exception as error:
+                delay = self._retry_delay(query, error, attempt, transient, deadline)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def _post(
+        self,
+        body: bytes,
+        timeout: tuple[float | None, float | None],
+        stream: bool = False,
+        timing: RequestTiming | None = None,
+        deadline: Deadline | None = None,
+    ) -> requests.Response:
+        if timing is not None:
+            pop_connect()
+        start = time.perf_counter()
+        response = self.session.request(
             self.method,
             self.host,
-            data=json.dumps({"query": query, "variables": params}).encode("utf-8"),
+            data=body,
+            # the body is read below, to time the download or bound it by the deadline
+            stream=stream or timing is not None or deadline is not None,
+            # requests takes None for either timeout, its stubs do not
+            timeout=timeout,  # type: ignore
         )
+        if response.status_code != 200:
+            with response:
+                self._raise_for_status(
+                    response.status_code,
+                    response.reason,
+                    response.content,
+                    response.headers.get("Retry-After"),
+                )
+        if not stream:
+            headers = time.perf_counter()
+            content = (
+                response.content
+                if deadline is None
+                else _read_before(response, deadline)
+            )
+            if timing is not None:
+                connect = pop_connect()
+                timing.attempt(
+                    connect,
+                    headers - start - (connect or 0.0),
+                    time.perf_counter() - headers,
+                    len(body),
+                    len(content),
+                )
+            self.latency.record(time.perf_counter() - start)
+        return response
 
-        if response.status_code == 200:
-            json_response = response.json()
-            self.print_graphql_result(json_response)
-            return json_response
-        elif response.content:
-            raise Exception(
-                str(response.status_code)
-                + ": "
-                + str(response.reason)
-                + ": "
-                + str(response.content.decode()),
+    def _hedged(
+        self,
+        body: bytes,
+        timeout: tuple[float | None, float | None],
+        hedge_after: float,
+        timing: RequestTiming | None = None,
+        deadline: Deadline | None = None,
+    ) -> requests.Response:
+        """
+        Sends the body and, if no answer came within `hedge_after` seconds, a
+        duplicate of it. Returns the first successful answer, the other one is
+        discarded when it completes.
+        """
+
+        # every attempt is timed apart, only the winner's timings are kept
+        timings = [
+            None if timing is None else RequestTiming(timing.operation)
+            for _ in range(2)
+        ]
+
+        primary = self.hedger.submit(
+            self._post,
+            body,
+            timeout,
+            False,
+            timings[0],
+            deadline,
+        )
+        wait([primary], timeout=hedge_after)
+        if primary.done():
+            response = primary.result()
+            if timing is not None:
+                timing.merge(timings[0])  # type: ignore
+            return response
+
+        secondary = self.hedger.submit(
+            self._post,
+            body,
+            timeout,
+            False,
+            timings[1],
+            deadline,
+        )
+        completed = as_completed((primary, secondary))
+        winner = next(completed)
+        if winner.exception() is not None:
+            # a failure only counts once both attempts failed
+            winner = next(completed)
+
+        loser = secondary if winner is primary else primary
+        loser.add_done_callback(_discard)
+        response = winner.result()
+        if timing is not None:
+            timing.merge(timings[0 if winner is primary else 1])  # type: ignore
+        return response
+
+    def request_stream(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        operation: str | None = None,
+        batch_size: int | None = None,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Streaming variant of `request` for large connections. The response is parsed
+        incrementally from the socket and `data.<operation>.edges[*].node` (or
+        `.nodes[*]`) are yielded as soon as they are decoded, so peak memory grows
+        with `batch_size` instead of with the response size. Nothing is rendered.
+
+        query (str): GraphQL compliant query string.
+        params (dictionary): dictionary containing the query parameters, values depend on query.
+        operation (str): response key holding the connection. Defaults to the first root field of the query.
+        batch_size (int): if set, yield responses of at most `batch_size` items shaped like the
+            original response, so they can be handed to the `RESOLVERS` methods. Otherwise yield nodes.
+        timeout (float or tuple): connect and read timeouts, the read one applies between two chunks.
+        deadline (Deadline or float): time budget in seconds to get the response headers.
+        """
+
+        import ijson
+
+        if operation is None:
+            operation = root_fields(query)[0]
+        edges_prefix = f"data.{operation}.edges.item.node"
+        nodes_prefix = f"data.{operation}.nodes.item"
+
+        response = self._send(query, params, True, timeout, deadline)
+
+        with response:
+            response.raw.decode_content = True
+
+            current = ""
+            items: str | None = None
+            batch: list[dict[str, Any]] = []
+            errors: list[Any] = []
+            builder: ijson.ObjectBuilder | None = None
+
+            for prefix, event, value in ijson.parse(response.raw, use_float=True):
+                if builder is not None:
+                    builder.event(event, value)
+                    if event in ("end_map", "end_array") and prefix == current:
+                        if current == "errors":
+                            errors = builder.value
+                        elif batch_size is None:
+                            yield builder.value
+                        else:
+                            batch.append(builder.value)
+                            if len(batch) >= batch_size:
+                                yield self._stream_batch(operation, items, batch)
+                                batch = []
+                        builder = None
+                elif (
+                    event == "start_map"
+                    and prefix in (edges_prefix, nodes_prefix)
+                    or event == "start_array"
+                    and prefix == "errors"
+                ):
+                    current = prefix
+                    if prefix != "errors":
+                        items = "edges" if prefix == edges_prefix else "nodes"
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+
+            if batch:
+                yield self._stream_batch(operation, items, batch)
+            if errors:
+                raise GraphQlResponseError(errors)
+
+    def _stream_batch(
+        self,
+        operation: str,
+        items: str | None,
+        nodes: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        if items == "nodes":
+            return {"data": {operation: {"nodes": nodes}}}
+        return {"data": {operation: {"edges": [{"node": node} for node in nodes]}}}
+
+    def batch(
+        self,
+        calls: Iterable[Call],
+        max_document_size: int = 16_384,
+        max_operations: int | None = None,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Executes several logical calls with as few HTTP requests as possible by merging
+        them into aliased GraphQL documents. Returns one response per call, in order,
+        shaped like the response of the original query.
+
+        calls (iterable): (query, params) tuples, e.g. the output of luxor.py `build_*` functions.
+        max_document_size (int): maximum length of a merged document, larger batches are split.
+        max_operations (int): maximum number of calls merged into one document.
+        render (bool): hand every per-call response to the client `sink`, if any.
+        timeout (float or tuple): connect and read timeouts of every request, overriding the client ones.
+        deadline (Deadline or float): overall time budget in seconds, shared by all requests.
+        """
+
+        deadline = Deadline.of(deadline)
+        results: list[dict[str, Any]] = []
+        for merged in batch_calls(calls, max_document_size, max_operations):
+            timing = self._timing(merged.query, "batch")
+            try:
+                response = self._execute(
+                    merged.query,
+                    merged.variables,
+                    timeout,
+                    deadline,
+                    timing,
+                )
+            except BaseException as error:
+                self._report(timing, merged.variables, type(error).__name__)
+                raise
+            self._report(timing, merged.variables)
+            results += merged.split(response)
+
+        for result in results:
+            self._render(result, render)
+        return results
+
+    def request_many(
+        self,
+        calls: Iterable[Call],
+        max_workers: int | None = None,
+        ordered: bool = True,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+    ) -> Iterator[CallResult]:
+        """
+        Sends independent calls in parallel from a pool of threads sharing the client
+        connection pool, and yields one `CallResult` per call. A failed call is
+        reported in its result, with the exception it raised, instead of stopping the
+        others. Calls are consumed lazily: at most twice `max_workers` are in flight
+        or waiting to be yielded at once, so the input can be a long generator.
+        The threads are kept by the client between calls, until `close()`.
+
+        calls (iterable): (query, params) tuples, e.g. the output of luxor.py `build_*` functions.
+        max_workers (int): number of calls sent at once, defaults to `pool_maxsize` so every one keeps a pooled connection.
+        ordered (bool): yield results in input order, otherwise as soon as they complete.
+        render (bool): hand every response to the client `sink`, if any.
+        timeout (float or tuple): connect and read timeouts of every call, overriding the client ones.
+        deadline (Deadline or float): overall time budget in seconds, shared by all calls.
+        """
+
+        deadline = Deadline.of(deadline)
+        max_workers = max_workers or self.pool_maxsize
+        todo = enumerate(calls)
+        pending: dict[
+            Future[dict[str, Any]],
+            tuple[int, str, dict[str, Any] | None],
+        ] = {}
+        done: dict[int, CallResult] = {}
+        following = 0
+
+        try:
+            while True:
+                # the workers may be shared with other calls, at most `max_workers` run
+                room = min(
+                    max_workers - len(pending),
+                    2 * max_workers - len(pending) - len(done),
+                )
+                for position, (query, params) in islice(todo, max(room, 0)):
+                    future = self._many_executor(max_workers).submit(
+                        self.request,
+                        query,
+                        params,
+                        render,
+                        timeout,
+                        deadline,
+                    )
+                    pending[future] = (position, query, params)
+                if not pending:
+                    return
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    position, query, params = pending.pop(future)
+                    error = future.exception()
+                    done[position] = CallResult(
+                        position,
+                        query,
+                        params,
+                        None if error is not None else future.result(),
+                        error,
+                    )
+
+                if not ordered:
+                    yield from done.values()
+                    done.clear()
+                while following in done:
+                    yield done.pop(following)
+                    following += 1
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def paginate(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        operation: str | None = None,
+        page_size: int | None = None,
+        prefetch: bool = False,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+        after: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Follows a cursor connection and yields the JSON response of every page,
+        so the `RESOLVERS` methods can consume each page unchanged.
+
+        query (str): GraphQL query declaring an `$after: Cursor` variable and selecting `pageInfo { hasNextPage endCursor }`.
+        params (dictionary): dictionary containing the query parameters, values depend on query.
+        operation (str): operation holding the connection. Defaults to the first one of the response.
+        page_size (int): number of items requested per page, overrides the `first` parameter.
+        prefetch (bool): request the next page in the background while the current one is consumed.
+        render (bool): hand every page to the client `sink`, if any.
+        timeout (float or tuple): connect and read timeouts of every page, overriding the client ones.
+        deadline (Deadline or float): overall time budget in seconds, shared by all pages.
+        after (str): cursor the first page starts after, e.g. an `endCursor` of a previous pagination.
+        """
+
+        deadline = Deadline.of(deadline)
+        pending: Future[dict[str, Any]] | None = None
+        page = self.request(
+            query,
+            _page_params(params, after, page_size),
+            render,
+            timeout,
+            deadline,
+        )
+
+        try:
+            while True:
+                cursor = _next_cursor(_connection(page, operation))
+                if cursor is not None and prefetch:
+                    pending = self.executor.submit(
+                        self.request,
+                        query,
+                        _page_params(params, cursor, page_size),
+                        render,
+                        timeout,
+                        deadline,
+                    )
+
+                yield page
+
+                if cursor is None:
+                    return
+                elif pending is not None:
+                    page = pending.result()
+                    pending = None
+                else:
+                    page = self.request(
+                        query,
+                        _page_params(params, cursor, page_size),
+                        render,
+                        timeout,
+                        deadline,
+                    )
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def iter_edges(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        operation: str | None = None,
+        page_size: int | None = None,
+        prefetch: bool = False,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Same as `paginate` but yields the connection items (`edges` or `nodes`) one by one.
+        Only one page is held in memory at a time (two with `prefetch`).
+        """
+
+        for page in self.paginate(
+            query,
+            params,
+            operation,
+            page_size,
+            prefetch,
+            render,
+            timeout,
+            deadline,
+        ):
+            yield from _connection_items(_connection(page, operation))
+
+
+class AsyncGraphQlClient(_BaseGraphQlClient):
+    def __init__(
+        self,
+        host: str,
+        key: str,
+        method: str,
+        *args: Any,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 15.0,
+        **options: Any,
+    ):
+        """
+        Takes the `host`, `key`, `method` and options of `_BaseGraphQlClient`, plus:
+
+        Parameters
+        ----------
+
+        limit : int
+            Maximum number of simultaneous connections. Default is 100.
+
+        limit_per_host : int
+            Maximum number of simultaneous connections to the API host. Default is 10.
+
+        keepalive_timeout : float
+            Seconds an idle connection is kept open for reuse. Default is 15.
+        """
+
+        super().__init__(host, key, method, *args, **options)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # closes of the sessions of previous loops, referenced until they are done
+        self._closing: set[asyncio.Future[None]] = set()
+
+    async def __aenter__(self) -> AsyncGraphQlClient:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Session shared by every request made through this client on the running event loop.
+        A new one is opened if the client is reused from a different loop, the previous
+        one is closed.
+        """
+
+        import asyncio
+
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                closing = self._close_stale(self._session, self._loop)
+                self._closing.add(closing)
+                closing.add_done_callback(self._closing.discard)
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                trace_configs=None if self.metrics is None else [trace_config()],
+            )
+            self._loop = loop
+        return self._session
+
+    def _close_stale(
+        self,
+        session: aiohttp.ClientSession,
+        loop: asyncio.AbstractEventLoop | None,
+    ) -> asyncio.Future[None]:
+        """
+        Closes a session opened on another event loop: on that loop if it still runs,
+        else from the running one. Connections of a loop already closed cannot be
+        shut down cleanly, use the client as an `async with` block on every loop.
+        """
+
+        import asyncio
+
+        if loop is not None and loop.is_running():
+            return asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(session.close(), loop),
             )
-        else:
-            raise Exception(str(response.status_code) + ": " + str(response.reason))
+        return asyncio.ensure_future(session.close())
+
+    async def close(self) -> None:
+        """
+        Closes the underlying session and every pooled connection.
+        """
+
+        import asyncio
+
+        session, self._session = self._session, None
+        loop, self._loop = self._loop, None
+        if session is not None and not session.closed:
+            if loop is asyncio.get_running_loop():
+                await session.close()
+            else:
+                self._closing.add(self._close_stale(session, loop))
+        if self._closing:
+            closing, self._closing = self._closing, set()
+            await asyncio.gather(*closing, return_exceptions=True)
+
+    async def request(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Base coroutine to execute operations against Luxor's GraphQL API
+
+        query (str): GraphQL compliant query string.
+        params (dictionary): dictionary containing the query parameters, values depend on query.
+        render (bool): hand the response to the client `sink`, if any.
+        timeout (float or tuple): connect and read timeouts of this call, overriding the client ones.
+        deadline (Deadline or float): overall time budget in seconds, shared by all retries.
+        """
+
+        timing = self._timing(query)
+        status = "ok"
+        try:
+            json_response: dict[str, Any] | None = (
+                self.cache.get(query, params) if self.cache is not None else None
+            )
+            if json_response is not None:
+                status = "cached"
+            elif self.flights is not None and self._coalesced(query):
+                deadline = Deadline.of(deadline)
+                json_response = await self.flights.do_async(
+                    _key(query, params),
+                    lambda: self._fetch(query, params, timeout, deadline, timing),
+                    deadline,
+                )
+            else:
+                json_response = await self._fetch(
+                    query,
+                    params,
+                    timeout,
+                    deadline,
+                    timing,
+                )
+
+            self._render(json_response, render, timing)
+        except BaseException as error:
+            self._report(timing, params, type(error).__name__)
+            raise
+        self._report(timing, params, status)
+        return json_response
+
+    async def _fetch(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        timeout: Timeout,
+        deadline: Deadline | float | None,
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        json_response = await self._execute(query, params, timeout, deadline, timing)
+        if self.cache is not None:
+            self.cache.put(query, params, json_response)
+        return json_response
+
+    async def _execute(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        deadline = Deadline.of(deadline)
+        if self.persisted_queries:
+            try:
+                return await self._send(query, params, timeout, deadline, True, timing)
+            except GraphQlResponseError as error:
+                if not self._persisted_query_missing(error):
+                    raise
+
+        return await self._send(query, params, timeout, deadline, False, timing)
+
+    async def _send(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        timeout: Timeout = None,
+        deadline: Deadline | None = None,
+        hash_only: bool = False,
+        timing: RequestTiming | None = None,
+    ) -> dict[str, Any]:
+        """
+        Sends the operation until it gets a 200 answer, see `GraphQlClient._send`.
+        """
+
+        import asyncio
+
+        import aiohttp
+
+        body = self._encode(query, params, hash_only)
+        transient = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+        timeout = self.timeout if timeout is None else timeout
+        hedge_after = self._hedge_after(query)
+
+        attempt = 0
+        while True:
+            if deadline is not None:
+                deadline.check()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            try:
+                connect, read = split_timeout(timeout)
+                client_timeout = aiohttp.ClientTimeout(
+                    total=None if deadline is None else deadline.remaining(),
+                    connect=connect,
+                    sock_read=read,
+                )
+                if hedge_after is None:
+                    content = await self._post(body, client_timeout, timing)
+                else:
+                    content = await self._hedged(
+                        body,
+                        client_timeout,
+                        hedge_after,
+                        timing,
+                    )
+                return self._decode(content, timing)
+            except Exception as error:
+                delay = self._retry_delay(query, error, attempt, transient, deadline)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _post(
+        self,
+        body: bytes,
+        timeout: aiohttp.ClientTimeout,
+        timing: RequestTiming | None = None,
+    ) -> bytes:
+        # filled with the connect time by the session trace config, see `metrics.trace_config`
+        phases: dict[str, float] = {}
+        start = time.perf_counter()
+        async with self.session.request(
+            self.method,
+            self.host,
+            data=body,
+            timeout=timeout,
+            trace_request_ctx=None if timing is None else phases,
+        ) as response:
+            headers = time.perf_counter()
+            content = await response.read()
+        end = time.perf_counter()
+
+        self._raise_for_status(
+            response.status,
+            response.reason,
+            content,
+            response.headers.get("Retry-After"),
+        )
+        if timing is not None:
+            connect = phases.get("connect")
+            timing.attempt(
+                connect,
+                headers - start - (connect or 0.0),
+                end - headers,
+                len(body),
+                len(content),
+            )
+        self.latency.record(end - start)
+        return content
+
+    async def _hedged(
+        self,
+        body: bytes,
+        timeout: aiohttp.ClientTimeout,
+        hedge_after: float,
+        timing: RequestTiming | None = None,
+    ) -> bytes:
+        """
+        Sends the body and, if no answer came within `hedge_after` seconds, a
+        duplicate of it. Returns the first successful answer and cancels the other.
+        """
+
+        import asyncio
+
+        # every attempt is timed apart, only the winner's timings are kept
+        timings: dict[asyncio.Future[bytes], RequestTiming | None] = {}
+
+        def attempt() -> asyncio.Future[bytes]:
+            attempt_timing = None if timing is None else RequestTiming(timing.operation)
+            task = asyncio.ensure_future(self._post(body, timeout, attempt_timing))
+            timings[task] = attempt_timing
+            return task
+
+        def won(task: asyncio.Future[bytes]) -> bytes:
+            content = task.result()
+            if timing is not None:
+                timing.merge(timings[task])  # type: ignore
+            return content
+
+        attempts = {attempt()}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+            if done:
+                return won(done.pop())
+
+            attempts.add(attempt())
+            pending = attempts
+            while True:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return won(task)
+                # a failure only counts once both attempts failed
+                if not pending:
+                    return done.pop().result()
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    async def batch(
+        self,
+        calls: Iterable[Call],
+        max_document_size: int = 16_384,
+        max_operations: int | None = None,
+        concurrency: int = 10,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Executes several logical calls merged into aliased GraphQL documents.
+        See `GraphQlClient.batch`, merged documents are sent concurrently.
+        """
+
+        deadline = Deadline.of(deadline)
+        batches = batch_calls(calls, max_document_size, max_operations)
+        responses = await self.gather(
+            (self._execute_batch(merged, timeout, deadline) for merged in batches),
+            concurrency=concurrency,
+        )
+
+        results: list[dict[str, Any]] = []
+        for merged, response in zip(batches, responses):
+            results += merged.split(response)  # type: ignore
+
+        for result in results:
+            self._render(result, render)
+        return results
+
+    async def _execute_batch(
+        self,
+        merged: Batch,
+        timeout: Timeout,
+        deadline: Deadline | None,
+    ) -> dict[str, Any]:
+        timing = self._timing(merged.query, "batch")
+        try:
+            response = await self._execute(
+                merged.query,
+                merged.variables,
+                timeout,
+                deadline,
+                timing,
+            )
+        except BaseException as error:
+            self._report(timing, merged.variables, type(error).__name__)
+            raise
+        self._report(timing, merged.variables)
+        return response
+
+    async def paginate(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        operation: str | None = None,
+        page_size: int | None = None,
+        prefetch: bool = False,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+        after: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Follows a cursor connection and yields the JSON response of every page.
+        See `GraphQlClient.paginate`.
+        """
+
+        import asyncio
+
+        deadline = Deadline.of(deadline)
+        pending: asyncio.Task[dict[str, Any]] | None = None
+        page = await self.request(
+            query,
+            _page_params(params, after, page_size),
+            render,
+            timeout,
+            deadline,
+        )
+
+        try:
+            while True:
+                cursor = _next_cursor(_connection(page, operation))
+                if cursor is not None and prefetch:
+                    pending = asyncio.ensure_future(
+                        self.request(
+                            query,
+                            _page_params(params, cursor, page_size),
+                            render,
+                            timeout,
+                            deadline,
+                        ),
+                    )
+
+                yield page
+
+                if cursor is None:
+                    return
+                elif pending is not None:
+                    page = await pending
+                    pending = None
+                else:
+                    page = await self.request(
+                        query,
+                        _page_params(params, cursor, page_size),
+                        render,
+                        timeout,
+                        deadline,
+                    )
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def iter_edges(
+        self,
+        query: str,
+        params: dict[str, Any] | None = None,
+        operation: str | None = None,
+        page_size: int | None = None,
+        prefetch: bool = False,
+        render: bool = True,
+        timeout: Timeout = None,
+        deadline: Deadline | float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Same as `paginate` but yields the connection items (`edges` or `nodes`) one by one.
+        """
+
+        async for page in self.paginate(
+            query,
+            params,
+            operation,
+            page_size,
+            prefetch,
+            render,
+            timeout,
+            deadline,
+        ):
+            for item in _connection_items(_connection(page, operation)):
+                yield item
+
+    async def gather(
+        self,
+        aws: Iterable[Awaitable[T]],
+        concurrency: int = 10,
+        return_exceptions: bool = False,
+    ) -> list[T | BaseException]:
+        """
+        Awaits every awaitable with at most `concurrency` of them in flight at once.
+        Results are returned in the same order as the input.
+
+        aws (iterable): awaitables to run, usually `request` calls or luxor.py `*_async` wrappers.
+        concurrency (int): maximum number of awaitables running at the same time.
+        return_exceptions (bool): return raised exceptions in the result list instead of propagating them.
+        """
+
+        import asyncio
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(aw: Awaitable[T]) -> T:
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(
+            *(bounded(aw) for aw in aws),
+            return_exceptions=return_exceptions,
+        )
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+from exceptions import DeadlineExceeded
+from timeouts import Deadline
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller of a key runs the call
+    and every caller arriving while it is in flight waits for it and gets the same
+    result, or the same exception. Nothing is kept once the call returns, this is
+    not a cache.
+
+    Thread safe. Coroutines are coalesced per event loop with `do_async`.
+    """
+
+    def __init__(self) -> None:
+        self.shared = 0
+
+        self._calls: dict[Hashable, Future[Any]] = {}
+        self._tasks: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop,
+            dict[Hashable, asyncio.Future[Any]],
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls) + sum(len(tasks) for tasks in self._tasks.values())
+
+    def do(
+        self,
+        key: Hashable,
+        function: Callable[[], T],
+        deadline: Deadline | None = None,
+    ) -> T:
+        """
+        Returns `function()`, or the result of the identical call already in flight.
+
+        key (hashable): identifies identical calls.
+        function (callable): the call, run by the first caller only.
+        deadline (Deadline): how long a caller waits for a call started by another one.
+        """
+
+        with self._lock:
+            waiting = self._calls.get(key)
+            if waiting is None:
+                future: Future[Any] = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+
+        if waiting is not None:
+            if deadline is None:
+                return waiting.result()
+            try:
+                return waiting.result(deadline.remaining())
+            except FutureTimeoutError:
+                raise DeadlineExceeded(deadline.seconds) from None
+
+        try:
+            result = function()
+        except BaseException as error:
+            self._land(key)
+            future.set_exception(error)
+            raise
+        self._land(key)
+        future.set_result(result)
+        return result
+
+    def _land(self, key: Hashable) -> None:
+        with self._lock:
+            del self._calls[key]
+
+    async def do_async(
+        self,
+        key: Hashable,
+        function: Callable[[], Awaitable[T]],
+        deadline: Deadline | None = None,
+    ) -> T:
+        """
+        Awaitable variant of `do`. The call runs in its own task, so a caller
+        being cancelled does not cancel it for the others.
+        """
+
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+
+        task = tasks.get(key)
+        if task is not None:
+            with self._lock:
+                self.shared += 1
+        else:
+            task = tasks[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: _landed(tasks, key, done))
+
+        if deadline is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(deadline.seconds) from None
+
+
+def _landed(
+    tasks: dict[Hashable, asyncio.Future[Any]],
+    key: Hashable,
+    task: asyncio.Future[Any],
+) -> None:
+    del tasks[key]
+    if not task.cancelled():
+        # every waiter may be gone, mark the exception as retrieved
+        task.exception()
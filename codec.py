@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+from typing import Callable
+from typing import NamedTuple
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAS_ORJSON = False
+
+
+class Codec(NamedTuple):
+    """
+    JSON backend used to encode request bodies and decode responses.
+    """
+
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+JSON = Codec("json", _json_dumps, json.loads)
+
+CODECS: dict[str, Codec] = {"json": JSON}
+
+if HAS_ORJSON:
+    CODECS["orjson"] = Codec("orjson", orjson.dumps, orjson.loads)
+
+
+def get_codec(name: str | None = None) -> Codec:
+    """
+    Returns the codec called `name`, or the fastest one installed:
+    `orjson` when available, the standard library `json` otherwise.
+    """
+
+    if name is None:
+        return CODECS.get("orjson", JSON)
+    if name not in CODECS:
+        raise ValueError(
+            f"JSON backend {name!r} is not available, options are: {list(CODECS)}",
+        )
+    return CODECS[name]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import uuid
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+# Columns holding the row timestamp, in order of preference, used for the day partition.
+# The partition is not called `date` so it does not clash with the column of that name.
+TIMESTAMP_COLUMNS = ("timestamp", "time", "date", "createdAt", "updatedAt")
+
+PARTITIONING = pa.schema(
+    [
+        ("subaccount", pa.string()),
+        ("mpn", pa.string()),
+        ("day", pa.string()),
+    ],
+)
+
+
+def _day(batch: pa.RecordBatch, day: str | None) -> pa.Array:
+    for column in TIMESTAMP_COLUMNS:
+        index = batch.schema.get_field_index(column)
+        if index == -1:
+            continue
+        values = batch.column(index)
+        if pa.types.is_string(values.type):
+            return pc.utf8_slice_codeunits(values, 0, 10)
+        return pc.strftime(values, format="%Y-%m-%d")
+
+    if day is None:
+        raise ValueError(
+            f"No timestamp column to partition by, expected one of: {TIMESTAMP_COLUMNS}",
+        )
+    return pa.array([day] * batch.num_rows, pa.string())
+
+
+def write_partitioned(
+    batch: pa.RecordBatch,
+    root: str,
+    subaccount: str,
+    mpn: str,
+    day: str | None = None,
+    file_format: str = "parquet",
+) -> list[str]:
+    """
+    Appends a RecordBatch, e.g. the output of `RESOLVERS(arrow=True)`, to a dataset
+    partitioned as `root/subaccount=<subaccount>/mpn=<mpn>/day=<YYYY-MM-DD>/`.
+
+    The day partition is taken from the first timestamp column of the batch, or
+    from `day` for results without one. Every call writes new files, so existing
+    partitions are appended to and never rewritten.
+
+    batch (RecordBatch): rows to write.
+    root (str): dataset root directory or URI.
+    subaccount (str): subaccount username.
+    mpn (str): mining pool name, e.g. BTC.
+    day (str): day partition used when the batch has no timestamp column.
+    file_format (str): file format of the dataset. Default is `parquet`.
+
+    Returns the paths of the files written.
+    """
+
+    if batch.num_rows == 0:
+        return []
+
+    partition = _day(batch, day)
+    batch = pa.RecordBatch.from_arrays(
+        [
+            *batch.columns,
+            pa.array([subaccount] * batch.num_rows, pa.string()),
+            pa.array([mpn] * batch.num_rows, pa.string()),
+            partition,
+        ],
+        names=[*batch.schema.names, *PARTITIONING.names],
+    )
+
+    paths: list[str] = []
+    ds.write_dataset(
+        batch,
+        root,
+        format=file_format,
+        partitioning=ds.partitioning(PARTITIONING, flavor="hive"),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.{file_format}",
+        existing_data_behavior="overwrite_or_ignore",
+        file_visitor=lambda written: paths.append(written.path),
+    )
+    return paths
+
+
+def read_partitioned(
+    root: str,
+    columns: list[str] | None = None,
+    subaccount: str | None = None,
+    mpn: str | None = None,
+    file_format: str = "parquet",
+) -> pa.Table:
+    """
+    Reads a dataset written by `write_partitioned`. Only the requested columns and
+    the matching partitions are read from disk.
+
+    root (str): dataset root directory or URI.
+    columns (list): columns to read. Default is all columns.
+    subaccount (str): only read this subaccount.
+    mpn (str): only read this mining pool.
+    file_format (str): file format of the dataset. Default is `parquet`.
+    """
+
+    dataset = ds.dataset(
+        root,
+        format=file_format,
+        partitioning=ds.partitioning(PARTITIONING, flavor="hive"),
+    )
+
+    predicate = None
+    for field, value in (("subaccount", subaccount), ("mpn", mpn)):
+        if value is not None:
+            expression = ds.field(field) == value
+            predicate = expression if predicate is None else predicate & expression
+
+    return dataset.to_table(columns=columns, filter=predicate)
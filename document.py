@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+_TOKEN = re.compile(
+    r"""
+    (?P<ignored>[\s,\ufeff]+|\#[^\n\r]*)
+    | (?P<string>\"\"\"(?:\\\"\"\"|[^"]|"(?!""))*\"\"\"|"(?:\\.|[^"\\\n\r])*")
+    | (?P<variable>\$[_A-Za-z][_0-9A-Za-z]*)
+    | (?P<name>[_A-Za-z][_0-9A-Za-z]*)
+    | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+    | (?P<punctuator>\.\.\.|[!&():=@\[\]{|}])
+    """,
+    re.VERBOSE,
+)
+
+_WORDS = ("variable", "name", "number")
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+
+
+def tokenize(query: str) -> list[Token]:
+    """
+    Splits a GraphQL document into its significant tokens.
+    Whitespace, commas and comments are dropped as they carry no meaning in GraphQL.
+    """
+
+    tokens: list[Token] = []
+    position = 0
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if match is None:
+            raise ValueError(
+                f"Unexpected character {query[position]!r} at position {position}",
+            )
+        kind = match.lastgroup
+        if kind != "ignored":
+            tokens.append(Token(kind, match.group()))  # type: ignore
+        position = match.end()
+    return tokens
+
+
+def join(tokens: list[Token]) -> str:
+    """
+    Renders tokens back into the smallest equivalent GraphQL text.
+    """
+
+    parts: list[str] = []
+    previous: Token | None = None
+    for token in tokens:
+        if previous is not None and previous.kind in _WORDS and token.kind in _WORDS:
+            parts.append(" ")
+        parts.append(token.value)
+        previous = token
+    return "".join(parts)
+
+
+def minify(query: str) -> str:
+    """
+    Returns the query without insignificant whitespace, commas and comments.
+    Two queries that only differ in formatting minify to the same string.
+    """
+
+    return join(tokenize(query))
+
+
+def operation_name(query: str) -> str | None:
+    """
+    Returns the name of the operation, e.g. `getRevenuePh` for `query getRevenuePh(...) {...}`.
+    """
+
+    tokens = tokenize(query)
+    if (
+        len(tokens) > 1
+        and tokens[0].value in ("query", "mutation", "subscription")
+        and tokens[1].kind == "name"
+    ):
+        return tokens[1].value
+    return None
+
+
+def operation_type(query: str) -> str:
+    """
+    Returns `query`, `mutation` or `subscription`. Shorthand documents are queries.
+    """
+
+    tokens = tokenize(query)
+    if tokens and tokens[0].value in ("mutation", "subscription"):
+        return tokens[0].value
+    return "query"
+
+
+def root_fields(query: str) -> list[str]:
+    """
+    Returns the response keys of the root fields of an operation, i.e. their aliases
+    or field names, e.g. `["miners"]` for the `getWorkersOverview` query.
+    """
+
+    tokens = tokenize(query)
+    position = [token.value for token in tokens].index("{") + 1
+
+    keys: list[str] = []
+    depth = 0
+    while position < len(tokens):
+        token = tokens[position]
+        if token.value in ("{", "(", "["):
+            depth += 1
+        elif token.value in ("}", ")", "]"):
+            depth -= 1
+            if depth < 0:
+                break
+        elif depth == 0 and token.kind == "name" and tokens[position - 1].value != "@":
+            keys.append(token.value)
+            if position + 1 < len(tokens) and tokens[position + 1].value == ":":
+                # skip the aliased field name
+                position += 2
+        position += 1
+    return keys
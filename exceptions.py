@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class GraphQlClientError(Exception):
+    """
+    Base class of the errors raised by the GraphQL clients.
+    """
+
+
+class GraphQlHTTPError(GraphQlClientError):
+    """
+    The API answered with a non-200 status.
+
+    status : HTTP status code.
+    reason : HTTP reason phrase.
+    body : raw response body, may be empty.
+    retry_after : seconds to wait before retrying, from the `Retry-After` header.
+    """
+
+    def __init__(
+        self,
+        status: int,
+        reason: str | None,
+        body: bytes = b"",
+        retry_after: float | None = None,
+    ):
+        # every argument goes to `args`, so the error survives pickling (e.g. from a process pool)
+        super().__init__(status, reason, body, retry_after)
+
+        self.status = status
+        self.reason = reason
+        self.body = body
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        message = f"{self.status}: {self.reason}"
+        if self.body:
+            message += f": {self.body.decode(errors='replace')}"
+        return message
+
+
+class GraphQlResponseError(GraphQlClientError):
+    """
+    The API answered but could not execute the operation: the response has
+    no `data` and carries the GraphQL `errors` explaining why.
+    """
+
+    def __init__(self, errors: list[dict[str, Any]]):
+        super().__init__(errors)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return json.dumps(self.errors)
+
+    @property
+    def codes(self) -> list[str]:
+        """
+        The `extensions.code` of every error that has one.
+        """
+
+        return [
+            error["extensions"]["code"]
+            for error in self.errors
+            if "code" in (error.get("extensions") or {})
+        ]
+
+
+class DeadlineExceeded(GraphQlClientError, TimeoutError):
+    """
+    The overall deadline of a call expired, across all its retries and pages.
+    """
+
+    def __init__(self, seconds: float):
+        super().__init__(seconds)
+        self.seconds = seconds
+
+    def __str__(self) -> str:
+        return f"Deadline of {self.seconds}s exceeded"
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+from typing import Callable
+from typing import TYPE_CHECKING
+
+from luxor import build_get_hashrate_score_history
+from luxor import build_get_subaccounts
+from luxor import build_get_worker_details
+
+if TYPE_CHECKING:
+    from client import GraphQlClient
+
+# Datasets exported for every subaccount: the RESOLVERS method turning a page into a table.
+DATASETS = {
+    "worker_details": "resolve_get_unrestricted_worker_details",
+    "hashrate_score_history": "resolve_get_hashrate_score_history",
+}
+
+# (dataset, subaccount, page number, JSON response of the page)
+Page = tuple[str, str, int, dict[str, Any]]
+
+
+class _Stage:
+    """
+    Counters of one pipeline stage, updated from any thread. Only `sized` stages
+    report the bytes they handled.
+    """
+
+    def __init__(self, sized: bool = False) -> None:
+        self.sized = sized
+        self.items = 0
+        self.rows = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.started: float | None = None
+        self.finished: float | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.started is None:
+                self.started = time.monotonic()
+
+    def record(self, rows: int, busy: float, size: int = 0) -> None:
+        with self._lock:
+            self.items += 1
+            self.rows += rows
+            self.bytes += size
+            self.busy += busy
+            self.finished = time.monotonic()
+
+    def summary(self) -> dict[str, Any]:
+        seconds = (
+            0.0
+            if self.started is None or self.finished is None
+            else self.finished - self.started
+        )
+        summary: dict[str, Any] = {"items": self.items, "rows": self.rows}
+        if self.sized:
+            summary["bytes"] = self.bytes
+        summary.update(
+            seconds=round(seconds, 3),
+            busy_seconds=round(self.busy, 3),
+            items_per_second=round(self.items / seconds, 2) if seconds else None,
+            rows_per_second=round(self.rows / seconds, 2) if seconds else None,
+        )
+        return summary
+
+
+def _partition(root: str, dataset: str, subaccount: str, mpn: str) -> str:
+    return os.path.join(root, dataset, f"subaccount={subaccount}", f"mpn={mpn}")
+
+
+def _resolve_and_write(
+    dataset: str,
+    subaccount: str,
+    part: int,
+    response: dict[str, Any],
+    root: str,
+    mpn: str,
+    file_format: str = "csv",
+    day: str | None = None,
+) -> tuple[int, int, float]:
+    """
+    Resolves one page and writes it to its partition: as a CSV file from a DataFrame,
+    or in other formats through `datalake.write_partitioned` from a RecordBatch.
+    Runs in a worker process. Returns the rows and bytes written and the seconds spent.
+    """
+
+    from resolvers import RESOLVERS
+
+    start = time.perf_counter()
+    if file_format != "csv":
+        from datalake import write_partitioned
+
+        batch = getattr(RESOLVERS(arrow=True), DATASETS[dataset])(response)
+        paths = write_partitioned(
+            batch,
+            os.path.join(root, dataset),
+            subaccount,
+            mpn,
+            day=day,
+            file_format=file_format,
+        )
+        size = sum(os.path.getsize(path) for path in paths)
+        return batch.num_rows, size, time.perf_counter() - start
+
+    df = getattr(RESOLVERS(df=True), DATASETS[dataset])(response)
+
+    directory = _partition(root, dataset, subaccount, mpn)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{part:05d}.csv")
+    df.to_csv(path, index=False)
+    return len(df), os.path.getsize(path), time.perf_counter() - start
+
+
+def export_fleet(
+    client: GraphQlClient,
+    mpn: str,
+    root: str = "export",
+    minutes: int = 60,
+    page_size: int = 1000,
+    fetch_workers: int = 8,
+    processes: int | None = None,
+    queue_size: int = 32,
+    subaccounts: list[str] | None = None,
+    file_format: str = "csv",
+) -> dict[str, Any]:
+    """
+    Exports the worker details and hashrate score history of every subaccount as CSV
+    files partitioned like `root/<dataset>/subaccount=<name>/mpn=<mpn>/part-00000.csv`,
+    one file per page. The partitions of the exported subaccounts are replaced.
+
+    Any other `file_format`, e.g. parquet, is written with `datalake.write_partitioned`
+    under `root/<dataset>` and read back with `datalake.read_partitioned`. Rows
+    without a timestamp, like the worker details, go to the day of the export.
+
+    Pages are fetched by a pool of threads while a pool of processes resolves and
+    writes the ones already fetched. The stages are joined by a queue of at most
+    `queue_size` pages, and at most two pages per process are being resolved, so
+    slow writes hold back the fetches instead of filling the memory.
+
+    A failed fetch or write is recorded in the summary and the rest of the export
+    goes on. The summary, with the throughput of every stage, is returned and
+    written to `root/summary.json`.
+
+    client (GraphQlClient): client sending the requests, nothing is rendered.
+    mpn (str): mining profile name, refers to the coin ticker
+    root (str): output directory
+    minutes (int): minutes lookback of the worker details
+    page_size (int): number of items requested per page
+    fetch_workers (int): number of threads fetching pages
+    processes (int): number of processes resolving and writing pages, defaults to the number of CPUs
+    queue_size (int): maximum number of fetched pages waiting to be resolved
+    subaccounts (list): subaccounts to export. Defaults to all of them.
+    file_format (str): file format, `csv` or one of pyarrow datasets, e.g. `parquet`.
+    """
+
+    if file_format != "csv":
+        from resolvers import pa
+
+        if pa is None:
+            raise ImportError(f"pyarrow is required to export as {file_format}")
+
+    stages = {"list": _Stage(), "fetch": _Stage(), "write": _Stage(sized=True)}
+    errors: list[dict[str, Any]] = []
+    errors_lock = threading.Lock()
+
+    def failed(
+        stage: str,
+        dataset: str | None,
+        subaccount: str,
+        error: BaseException,
+    ) -> None:
+        with errors_lock:
+            errors.append(
+                {
+                    "stage": stage,
+                    "dataset": dataset,
+                    "subaccount": subaccount,
+                    "error": f"{type(error).__name__}: {error}",
+                },
+            )
+
+    started = time.monotonic()
+    day = time.strftime("%Y-%m-%d", time.gmtime())
+    if subaccounts is None:
+        stages["list"].start()
+        begin = time.perf_counter()
+        subaccounts = [
+            item["node"]["username"]
+            for item in client.iter_edges(
+                *build_get_subaccounts(page_size),
+                operation="users",
+                render=False,
+            )
+        ]
+        stages["list"].record(len(subaccounts), time.perf_counter() - begin)
+
+    builders: dict[str, Callable[[str], tuple[str, dict[str, Any]]]] = {
+        "worker_details": lambda subaccount: build_get_worker_details(
+            subaccount,
+            mpn,
+            minutes,
+            page_size,
+        ),
+        "hashrate_score_history": lambda subaccount: build_get_hashrate_score_history(
+            subaccount,
+            mpn,
+            page_size,
+        ),
+    }
+    for dataset in DATASETS:
+        for subaccount in subaccounts:
+            shutil.rmtree(
+                _partition(root, dataset, subaccount, mpn),
+                ignore_errors=True,
+            )
+
+    pages: queue.Queue[Page | None] = queue.Queue(maxsize=queue_size)
+
+    def fetch(dataset: str, subaccount: str) -> None:
+        stages["fetch"].start()
+        try:
+            begin = time.perf_counter()
+            for part, page in enumerate(
+                client.paginate(*builders[dataset](subaccount), render=False),
+            ):
+                connection = next(iter(page["data"].values()))
+                rows = len(connection.get("edges") or connection.get("nodes") or [])
+                stages["fetch"].record(rows, time.perf_counter() - begin)
+                # blocks while the queue is full, the writers set the pace
+                pages.put((dataset, subaccount, part, page))
+                begin = time.perf_counter()
+        except Exception as error:
+            failed("fetch", dataset, subaccount, error)
+
+    def fetch_all(fetchers: ThreadPoolExecutor, subaccounts: list[str]) -> None:
+        try:
+            jobs = [
+                fetchers.submit(fetch, dataset, subaccount)
+                for subaccount in subaccounts
+                for dataset in DATASETS
+            ]
+            for job in jobs:
+                job.result()
+        finally:
+            # the writers stop on it, even if the fetches could not all be started
+            pages.put(None)
+
+    processes = processes or os.cpu_count() or 1
+    # at most two pages per process: one being resolved and one ready to start
+    slots = threading.BoundedSemaphore(2 * processes)
+
+    def written(
+        dataset: str,
+        subaccount: str,
+        future: Future[tuple[int, int, float]],
+    ) -> None:
+        slots.release()
+        try:
+            rows, size, busy = future.result()
+        except Exception as error:
+            failed("write", dataset, subaccount, error)
+        else:
+            stages["write"].record(rows, busy, size)
+
+    # worker processes are spawned, forking a process running fetch threads is unsafe
+    with ProcessPoolExecutor(
+        processes,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as writers, ThreadPoolExecutor(
+        fetch_workers,
+        thread_name_prefix="export-fetch",
+    ) as fetchers:
+        producer = threading.Thread(
+            target=fetch_all,
+            args=(fetchers, subaccounts),
+            daemon=True,
+        )
+        producer.start()
+
+        while True:
+            item = pages.get()
+            if item is None:
+                break
+            dataset, subaccount, part, page = item
+            slots.acquire()
+            stages["write"].start()
+            try:
+                future = writers.submit(
+                    _resolve_and_write,
+                    dataset,
+                    subaccount,
+                    part,
+                    page,
+                    root,
+                    mpn,
+                    file_format,
+                    day,
+                )
+            except Exception as error:
+                # e.g. a broken pool, keep draining the queue so the fetchers finish
+                slots.release()
+                failed("write", dataset, subaccount, error)
+                continue
+            future.add_done_callback(partial(written, dataset, subaccount))
+        producer.join()
+
+    summary = {
+        "mpn": mpn,
+        "root": root,
+        "subaccounts": len(subaccounts),
+        "seconds": round(time.monotonic() - started, 3),
+        "stages": {name: stage.summary() for name, stage in stages.items()},
+        "errors": errors,
+    }
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import random
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging.handlers import QueueListener
+
+    from metrics import RequestTiming
+
+# Logger of the per call records of verbose clients.
+REQUESTS = "luxor.requests"
+
+logger = logging.getLogger(REQUESTS)
+
+
+def variables_hash(params: dict[str, Any] | None) -> str | None:
+    """
+    Short hash of the canonical JSON of the variables: tells calls apart in the
+    logs without writing subaccount names or cursors to disk.
+    """
+
+    if not params:
+        return None
+    variables = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(variables.encode("utf-8")).hexdigest()[:12]
+
+
+def log_request(timing: RequestTiming, params: dict[str, Any] | None) -> None:
+    """
+    Logs the structured record of a finished call to the `luxor.requests` logger.
+    """
+
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    duration = timing.phases.get("total", 0.0) * 1e3
+    logger.info(
+        "%s %s %.1fms",
+        timing.operation,
+        timing.status,
+        duration,
+        extra={
+            "request": {
+                "operation": timing.operation,
+                "variables": variables_hash(params),
+                "status": timing.status,
+                "duration_ms": round(duration, 3),
+                "attempts": timing.attempts,
+                "sent": timing.sent,
+                "received": timing.received,
+            },
+        },
+    )
+
+
+class SampleFilter(logging.Filter):
+    """
+    Keeps a random `rate` of the call records, and every failed call.
+    Other records go through untouched.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:  # noqa: A003
+        request = getattr(record, "request", None)
+        if request is None or request["status"] not in ("ok", "cached"):
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as JSON lines, the fields of call records included.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:  # noqa: A003
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds",
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        request = getattr(record, "request", None)
+        if request is not None:
+            entry.update(request)
+        else:
+            # tracebacks are already part of the message once through the queue
+            entry["message"] = record.getMessage()
+        return json.dumps(entry, default=str)
+
+
+def configure(
+    path: str = "requests.log",
+    level: int = logging.INFO,
+    max_bytes: int = 10_000_000,
+    backup_count: int = 5,
+    sample: float = 1.0,
+    console: bool = True,
+) -> QueueListener:
+    """
+    Sets up process wide logging without blocking the callers: records are put
+    on a queue and written by a background thread, as JSON lines to a file rotated
+    by size and, call records excepted, to the console.
+
+    path (str): log file, rotated into `path.1`, `path.2`... once `max_bytes` large.
+    level (int): minimum level of the records logged.
+    max_bytes (int): size of the log file triggering a rotation.
+    backup_count (int): number of rotated files kept.
+    sample (float): fraction of the successful call records kept, failed ones always are.
+    console (bool): also print the records, call records excepted, to stderr.
+
+    Returns the started listener, stopped (and flushed) at exit.
+    """
+
+    import atexit
+    import queue
+    from logging.handlers import QueueHandler
+    from logging.handlers import QueueListener
+    from logging.handlers import RotatingFileHandler
+
+    file_handler = RotatingFileHandler(
+        path,
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        delay=True,
+    )
+    file_handler.setFormatter(JsonFormatter())
+    handlers: list[logging.Handler] = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(
+            logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"),
+        )
+        console_handler.addFilter(lambda record: record.name != REQUESTS)
+        handlers.append(console_handler)
+
+    records: queue.Queue[logging.LogRecord] = queue.Queue()
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(records))
+    # dropped before reaching the queue, sampled out records cost nothing more
+    logger.addFilter(SampleFilter(sample))
+    return listener
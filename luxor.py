@@ -1,49 +1,118 @@
 from __future__ import annotations
 
 import json
-import logging
 import os
 from typing import Any
+from typing import Callable
+from typing import TYPE_CHECKING
+from typing import TypeVar
 
-import typer
-from dotenv import load_dotenv
-from rich import print
+from queries import OPERATIONS
+from queries import project
 
-from client import GraphQlClient
+if TYPE_CHECKING:
+    from client import AsyncGraphQlClient
+    from client import GraphQlClient
 
-load_dotenv()
+F = TypeVar("F", bound=Callable[..., Any])
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("requests.log")],
-)
+# Functions exposed as CLI commands, registered with typer by `app()`.
+# Kept as a plain list so importing luxor as a library does not import typer.
+COMMANDS: list[Callable[..., Any]] = []
 
+_CLIENT: GraphQlClient | None = None
+_ASYNC_CLIENT: AsyncGraphQlClient | None = None
 
-app = typer.Typer()
 
-HOST = os.getenv("HOST")
-API_KEY = os.getenv("API_KEY")
-METHOD = os.getenv("METHOD")
+def command(function: F) -> F:
+    """
+    Registers a function as a CLI command.
+    """
 
-env_settings: list[str | None] = [HOST, API_KEY, METHOD]
+    COMMANDS.append(function)
+    return function
 
-if None in env_settings:
-    print("[bold red]Alert![/bold red] It seems you have not setup your .env file.")
-    print(
-        "Please copy the [bold].env.example[/bold] with the name of [bold green].env[/bold green] and write your own values",
-    )
-    exit(1)
 
+def _environment() -> tuple[str | None, str | None, str | None]:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("HOST"), os.getenv("API_KEY"), os.getenv("METHOD")
+
+
+def get_client() -> GraphQlClient:
+    """
+    Returns the shared `GraphQlClient`, created from the HOST, API_KEY and METHOD
+    environment variables (or .env file) on first use.
+    """
+
+    global _CLIENT
+
+    if _CLIENT is None:
+        from client import GraphQlClient
+
+        host, key, method = _environment()
+        if None in (host, key, method):
+            raise RuntimeError("HOST, API_KEY and METHOD must be set, see .env.example")
+        _CLIENT = GraphQlClient(host=host, key=key, method=method)  # type: ignore
+    return _CLIENT
+
+
+def get_async_client() -> AsyncGraphQlClient:
+    """
+    Returns the shared `AsyncGraphQlClient`, see `get_client`.
+    """
+
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is None:
+        from client import AsyncGraphQlClient
+
+        host, key, method = _environment()
+        if None in (host, key, method):
+            raise RuntimeError("HOST, API_KEY and METHOD must be set, see .env.example")
+        _ASYNC_CLIENT = AsyncGraphQlClient(host=host, key=key, method=method)  # type: ignore
+    return _ASYNC_CLIENT
+
+
+def __getattr__(name: str) -> Any:
+    # `luxor.CLIENT` and `luxor.ASYNC_CLIENT` are kept for existing callers
+    if name == "CLIENT":
+        return get_client()
+    if name == "ASYNC_CLIENT":
+        return get_async_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _synced(written: int, db: str) -> None:
+    from rich import print
+
+    print(f"[bold green]{written}[/bold green] rows synced into {db}")
+
+
+def build_get_all_transaction_history(
+    mpn: str,
+    subaccount: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getAllTransactionHistory` query and its parameters.
+    """
+
+    query = project("get_all_transaction_history", fields)
+
+    params = {"cid": mpn, "uname": f"{subaccount}", "first": first}
 
-CLIENT = GraphQlClient(host=HOST, key=API_KEY, method=METHOD)  # type: ignore
+    return query, params
 
 
-@app.command()
+@command
 def get_all_transaction_history(
     mpn: str,
     subaccount: str,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Get all the transaction history of the user associated to the token provided.
@@ -51,30 +120,41 @@ def get_all_transaction_history(
     mpn (str): mining profile name, refers to the coin ticker
     subaccount (str): subaccount username
     first (int): limits the number of data points returned.
+    fields (list): subset of the fields to request, in order, defaults to all of them
     """
 
-    query = """query getAllTransactionHistory($cid: CurrencyProfileName!, $uname: String!, $first: Int) {
-        getAllTransactionHistory(cid: $cid, uname: $uname, first: $first, orderBy: CREATED_AT_DESC) {
-            edges {
-                node {
-                    transactionId
-                    amount
-                    status
-                    payoutAddress
-                    currency
-                    createdAt
-                }
-            }
-        }
-    }
+    return get_client().request(
+        *build_get_all_transaction_history(mpn, subaccount, first, fields),
+    )
+
+
+async def get_all_transaction_history_async(
+    mpn: str,
+    subaccount: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_all_transaction_history`, executed with the shared `ASYNC_CLIENT`.
     """
 
-    params = {"cid": mpn, "uname": f"{subaccount}", "first": first}
+    return await get_async_client().request(
+        *build_get_all_transaction_history(mpn, subaccount, first, fields),
+    )
 
-    return CLIENT.request(query, params)
 
+def build_get_subaccounts(first: int, offset: int = 0) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getSubaccounts` query and its parameters.
+    """
+
+    query = OPERATIONS["get_subaccounts"].query
+    params = {"first": first, "offset": offset}
 
-@app.command()
+    return query, params
+
+
+@command
 def get_subaccounts(first: int, offset: int = 0) -> dict[str, Any]:
     """
     Returns all subaccounts that belong to the Profile owner of the API Key.
@@ -83,17 +163,44 @@ def get_subaccounts(first: int, offset: int = 0) -> dict[str, Any]:
     offset (int): skips elements of data points returned.
     """
 
-    query = """query getSubaccounts($first: Int, $offset: Int) {users(first: $first, offset: $offset) {edges {node {username}}}}"""
-    params = {"first": first, "offset": offset}
+    return get_client().request(*build_get_subaccounts(first, offset))
+
+
+async def get_subaccounts_async(first: int, offset: int = 0) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_subaccounts`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(*build_get_subaccounts(first, offset))
+
+
+def build_get_subaccount_mining_summary(
+    subaccount: str,
+    mpn: str,
+    input_interval: str,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getMiningSummary` query and its parameters.
+    """
 
-    return CLIENT.request(query, params)
+    query = project("get_subaccount_mining_summary", fields)
 
+    params = {
+        "userName": f"{subaccount}",
+        "mpn": mpn,
+        "inputDuration": input_interval,
+    }
+
+    return query, params
 
-@app.command()
+
+@command
 def get_subaccount_mining_summary(
     subaccount: str,
     mpn: str,
     input_interval: str,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns an object of a subaccount mining summary.
@@ -101,36 +208,80 @@ def get_subaccount_mining_summary(
     subaccount (str): subaccount username
     mpn (str): mining profile name, refers to the coin ticker
     inputInterval (str): intervals to generate the mining summary lookback, options are: `_15_MINUTE`, `_1_HOUR`, `_1_HOUR` and `_1_DAY`
+    fields (list): subset of the fields to request, in order, defaults to all of them
+    """
+
+    return get_client().request(
+        *build_get_subaccount_mining_summary(subaccount, mpn, input_interval, fields),
+    )
+
+
+async def get_subaccount_mining_summary_async(
+    subaccount: str,
+    mpn: str,
+    input_interval: str,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_subaccount_mining_summary`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_subaccount_mining_summary(subaccount, mpn, input_interval, fields),
+    )
+
+
+@command
+def get_subaccounts_mining_summary(
+    mpn: str,
+    input_interval: str,
+    subaccounts: list[str],
+    fields: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Returns the mining summary of several subaccounts, batched into as few requests as possible.
+
+    mpn (str): mining profile name, refers to the coin ticker
+    input_interval (str): intervals to generate the mining summary lookback, options are: `_15_MINUTE`, `_1_HOUR`, `_1_HOUR` and `_1_DAY`
+    subaccounts (str): one or more subaccount usernames
+    fields (list): subset of the fields to request, in order, defaults to all of them
     """
 
-    query = """query getMiningSummary($mpn: MiningProfileName!, $userName: String!, $inputDuration: HashrateIntervals!) {
-                    getMiningSummary(mpn: $mpn, userName: $userName, inputDuration: $inputDuration) {
-                        hashrate
-                        validShares
-                        invalidShares
-                        staleShares
-                        badShares
-                        lowDiffShares
-                        revenue
-                }
-            }
+    return get_client().batch(
+        build_get_subaccount_mining_summary(subaccount, mpn, input_interval, fields)
+        for subaccount in subaccounts
+    )
+
+
+def build_get_subaccount_hashrate_history(
+    subaccount: str,
+    mpn: str,
+    input_interval: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getHashrateHistory` query and its parameters.
     """
 
+    query = project("get_subaccount_hashrate_history", fields)
     params = {
-        "userName": f"{subaccount}",
+        "inputUsername": f"{subaccount}",
         "mpn": mpn,
-        "inputDuration": input_interval,
+        "inputInterval": input_interval,
+        "first": first,
     }
 
-    return CLIENT.request(query, params)
+    return query, params
 
 
-@app.command()
+@command
 def get_subaccount_hashrate_history(
     subaccount: str,
     mpn: str,
     input_interval: str,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns an object of a subaccount hashrate timeseries.
@@ -139,34 +290,73 @@ def get_subaccount_hashrate_history(
     mpn (str): mining profile name, refers to the coin ticker
     input_interval (str): intervals to generate the timeseries, options are: `_15_MINUTE`, `_1_HOUR`, `_6_HOUR` and `_1_DAY`
     first (int): limits the number of data points returned
+    fields (list): subset of the fields to request, in order, defaults to all of them
+    """
+
+    return get_client().request(
+        *build_get_subaccount_hashrate_history(
+            subaccount,
+            mpn,
+            input_interval,
+            first,
+            fields,
+        ),
+    )
+
+
+async def get_subaccount_hashrate_history_async(
+    subaccount: str,
+    mpn: str,
+    input_interval: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_subaccount_hashrate_history`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_subaccount_hashrate_history(
+            subaccount,
+            mpn,
+            input_interval,
+            first,
+            fields,
+        ),
+    )
+
+
+def build_get_worker_details(
+    subaccount: str,
+    mpn: str,
+    minutes: int,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
     """
+    Returns the `getWorkerDetails` query and its parameters.
+    """
+
+    query = project("get_worker_details", fields)
 
-    query = """query getHashrateHistory($inputUsername: String, $mpn: MiningProfileName, $inputInterval: HashrateIntervals, $first: Int) {
-        getHashrateHistory(inputUsername: $inputUsername, mpn: $mpn, inputInterval: $inputInterval, first: $first) {
-            edges {
-                node {
-                    time
-                    hashrate
-                }
-            }
-        }
-    }"""
+    duration = {"minutes": minutes}
     params = {
-        "inputUsername": f"{subaccount}",
+        "duration": duration,
         "mpn": mpn,
-        "inputInterval": input_interval,
+        "uname": f"{subaccount}",
         "first": first,
     }
 
-    return CLIENT.request(query, params)
+    return query, params
 
 
-@app.command()
+@command
 def get_worker_details(
     subaccount: str,
     mpn: str,
     minutes: int,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns object of all workers pointed to a subaccount hashrate and efficiency details with a user-defined interval.
@@ -175,50 +365,52 @@ def get_worker_details(
     mpn (str): mining profile name, refers to the coin ticker
     minutes (int): minutes lookback to generate metrics
     first (int): limits the number of data points returned
+    fields (list): subset of the fields to request, in order, defaults to all of them
     """
 
-    query = """query getWorkerDetails($duration: IntervalInput!, $mpn: MiningProfileName!, $uname: String!, $first: Int) {
-                    getWorkerDetails(
-                        duration: $duration
-                        mpn: $mpn
-                        uname: $uname
-                        first: $first
-                    ) {
-                        edges {
-                        node {
-                            workerName
-                            hashrate
-                            validShares
-                            staleShares
-                            badShares
-                            duplicateShares
-                            invalidShares
-                            lowDiffShares
-                            efficiency
-                            revenue
-                            status
-                            updatedAt
-                        }
-                        }
-                    }
-                }"""
+    return get_client().request(
+        *build_get_worker_details(subaccount, mpn, minutes, first, fields),
+    )
+
+
+async def get_worker_details_async(
+    subaccount: str,
+    mpn: str,
+    minutes: int,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_worker_details`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_worker_details(subaccount, mpn, minutes, first, fields),
+    )
 
-    duration = {"minutes": minutes}
-    params = {
-        "duration": duration,
-        "mpn": mpn,
-        "uname": f"{subaccount}",
-        "first": first,
-    }
 
-    return CLIENT.request(query, params)
+def build_get_worker_details_1H(
+    subaccount: str,
+    mpn: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getWorkersOverview` query and its parameters.
+    """
+
+    query = project("get_worker_details_1H", fields)
+    params = {"username": f"{subaccount}", "mpn": mpn, "first": first}
+
+    return query, params
 
 
-@app.command()
+@command
 def get_worker_details_1H(
     subaccount: str,
     mpn: str,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns object of all workers pointed to a subaccount hashrate and efficiency details in the last hour.
@@ -226,41 +418,51 @@ def get_worker_details_1H(
     subaccount (str): subaccount username
     mpn (str): mining profile name, refers to the coin ticker
     first (int): limits the number of data points returned
+    fields (list): subset of the fields to request, in order, defaults to all of them
+    """
+
+    return get_client().request(
+        *build_get_worker_details_1H(subaccount, mpn, first, fields),
+    )
+
+
+async def get_worker_details_1H_async(
+    subaccount: str,
+    mpn: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
     """
+    Awaitable variant of `get_worker_details_1H`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_worker_details_1H(subaccount, mpn, first, fields),
+    )
+
 
-    query = """query getWorkersOverview($mpn: MiningProfileName, $username: String, $first: Int) {
-                miners(filter: {
-                        miningProfileName: { equalTo: $mpn }
-                        user: { username: { equalTo: $username } }
-                }, first: $first) {
-                    edges {
-                    node {
-                        workerName
-                        details1H {
-                            hashrate
-                            status
-                            efficiency
-                            validShares
-                            staleShares
-                            badShares
-                            duplicateShares
-                            invalidShares
-                            lowDiffShares
-                        }
-                    }
-                }
-            }
-        }"""
+def build_get_worker_details_24H(
+    subaccount: str,
+    mpn: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getWorkersOverview` query and its parameters.
+    """
+
+    query = project("get_worker_details_24H", fields)
     params = {"username": f"{subaccount}", "mpn": mpn, "first": first}
 
-    return CLIENT.request(query, params)
+    return query, params
 
 
-@app.command()
+@command
 def get_worker_details_24H(
     subaccount: str,
     mpn: str,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns object of all workers pointed to a subaccount hashrate and efficiency details in the last 24 hours.
@@ -268,37 +470,57 @@ def get_worker_details_24H(
     subaccount (str): subaccount username
     mpn (str): mining profile name, refers to the coin ticker
     first (int): limits the number of data points returned
+    fields (list): subset of the fields to request, in order, defaults to all of them
     """
 
-    query = """query getWorkersOverview($mpn: MiningProfileName, $username: String, $first: Int) {
-                miners(filter: {
-                        miningProfileName: { equalTo: $mpn }
-                        user: { username: { equalTo: $username } }
-                }, first: $first) {
-                    edges {
-                    node {
-                        workerName
-                        details24H {
-                            hashrate
-                            status
-                            efficiency
-                            validShares
-                            staleShares
-                            badShares
-                            duplicateShares
-                            invalidShares
-                            lowDiffShares
-                        }
-                    }
-                }
-            }
-        }"""
-    params = {"username": f"{subaccount}", "mpn": mpn, "first": first}
+    return get_client().request(
+        *build_get_worker_details_24H(subaccount, mpn, first, fields),
+    )
+
 
-    return CLIENT.request(query, params)
+async def get_worker_details_24H_async(
+    subaccount: str,
+    mpn: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_worker_details_24H`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_worker_details_24H(subaccount, mpn, first, fields),
+    )
+
+
+def build_get_worker_hashrate_history(
+    subaccount: str,
+    workername: str,
+    mpn: str,
+    input_bucket: str,
+    input_duration: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getWorkerHashrateHistory` query and its parameters.
+    """
 
+    query = project("get_worker_hashrate_history", fields)
 
-@app.command()
+    params = {
+        "inputUsername": f"{subaccount}",
+        "workerName": workername,
+        "mpn": mpn,
+        "inputBucket": input_bucket,
+        "inputDuration": input_duration,
+        "first": first,
+    }
+
+    return query, params
+
+
+@command
 def get_worker_hashrate_history(
     subaccount: str,
     workername: str,
@@ -306,6 +528,7 @@ def get_worker_hashrate_history(
     input_bucket: str,
     input_duration: str,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns an object of a miner hashrate timeseries.
@@ -316,58 +539,129 @@ def get_worker_hashrate_history(
     input_bucket (str): intervals to generate the timeseries, options are: `_15_MINUTE`, `_1_HOUR`, `_6_HOUR` and `_1_DAY`
     input_duration (str): intervals to generate the timeseries, options are: `_15_MINUTE`, `_1_HOUR`, `_6_HOUR` and `_1_DAY`
     first (int): limits the number of data points returned
+    fields (list): subset of the fields to request, in order, defaults to all of them
+    """
+
+    return get_client().request(
+        *build_get_worker_hashrate_history(
+            subaccount,
+            workername,
+            mpn,
+            input_bucket,
+            input_duration,
+            first,
+            fields,
+        ),
+    )
+
+
+async def get_worker_hashrate_history_async(
+    subaccount: str,
+    workername: str,
+    mpn: str,
+    input_bucket: str,
+    input_duration: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_worker_hashrate_history`, executed with the shared `ASYNC_CLIENT`.
     """
 
-    query = """query getWorkerHashrateHistory($inputUsername: String!, $workerName: String!, $mpn: MiningProfileName!, $inputBucket: HashrateIntervals!, $inputDuration: HashrateIntervals!, $first: Int) {
-                getWorkerHashrateHistory(username: $inputUsername, workerName: $workerName, mpn: $mpn, inputBucket: $inputBucket, inputDuration: $inputDuration, first: $first) {
-                    edges {
-                        node {
-                            time
-                            hashrate
-                        }
-                    }
-                }
-            }"""
+    return await get_async_client().request(
+        *build_get_worker_hashrate_history(
+            subaccount,
+            workername,
+            mpn,
+            input_bucket,
+            input_duration,
+            first,
+            fields,
+        ),
+    )
 
-    params = {
-        "inputUsername": f"{subaccount}",
-        "workerName": workername,
-        "mpn": mpn,
-        "inputBucket": input_bucket,
-        "inputDuration": input_duration,
-        "first": first,
-    }
 
-    return CLIENT.request(query, params)
+def build_get_subaccount_workers_status(
+    mpn: str,
+    subaccount: str,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getUserMinersStatusCount` query and its parameters.
+    """
 
+    query = project("get_subaccount_workers_status", fields)
+
+    params = {"mpn": mpn, "usrname": f"{subaccount}"}
 
-@app.command()
+    return query, params
+
+
+@command
 def get_subaccount_workers_status(
     mpn: str,
     subaccount: str,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns an integer count of distinct Profile active workers.
 
     mpn (str): mining profile name, refers to the coin ticker
     subaccount (str): subaccount name
+    fields (list): subset of the fields to request, in order, defaults to all of them
     """
 
-    query = """query getUserMinersStatusCount($usrname: String!, $mpn: MiningProfileName!) {
-                getUserMinersStatusCount(usrname: $usrname, mpn: $mpn) {
-                    dead
-                    warning
-                    active
-                }
-            }
+    return get_client().request(
+        *build_get_subaccount_workers_status(mpn, subaccount, fields),
+    )
+
+
+async def get_subaccount_workers_status_async(
+    mpn: str,
+    subaccount: str,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_subaccount_workers_status`, executed with the shared `ASYNC_CLIENT`.
     """
 
-    params = {"mpn": mpn, "usrname": f"{subaccount}"}
+    return await get_async_client().request(
+        *build_get_subaccount_workers_status(mpn, subaccount, fields),
+    )
+
+
+@command
+def get_subaccounts_workers_status(
+    mpn: str,
+    subaccounts: list[str],
+    fields: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Returns the workers status count of several subaccounts, batched into as few requests as possible.
+
+    mpn (str): mining profile name, refers to the coin ticker
+    subaccounts (str): one or more subaccount usernames
+    fields (list): subset of the fields to request, in order, defaults to all of them
+    """
 
-    return CLIENT.request(query, params)
+    return get_client().batch(
+        build_get_subaccount_workers_status(mpn, subaccount, fields)
+        for subaccount in subaccounts
+    )
+
+
+def build_get_pool_hashrate(mpn: str, org_slug: str) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getPoolHashrate` query and its parameters.
+    """
+
+    query = OPERATIONS["get_pool_hashrate"].query
+    params = {"mpn": mpn, "orgSlug": org_slug}
+
+    return query, params
 
 
-@app.command()
+@command
 def get_pool_hashrate(mpn: str, org_slug: str) -> dict[str, Any]:
     """
     Returns an integer count of distinct Profile active workers.
@@ -375,15 +669,40 @@ def get_pool_hashrate(mpn: str, org_slug: str) -> dict[str, Any]:
     mpn (str): mining profile name, refers to the coin ticker
     org_slug (str): organization name
     """
-    query = """query getPoolHashrate {
-                getPoolHashrate(mpn: BTC, orgSlug: "luxor")
-            }
-        """
-    params = {"mpn": mpn, "orgSlug": org_slug}
-    return CLIENT.request(query, params)
 
+    return get_client().request(*build_get_pool_hashrate(mpn, org_slug))
+
+
+async def get_pool_hashrate_async(mpn: str, org_slug: str) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_pool_hashrate`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(*build_get_pool_hashrate(mpn, org_slug))
 
-@app.command()
+
+def build_get_revenue(
+    subaccount: str,
+    mpn: str,
+    start_interval: str,
+    end_interval: str,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getRevenue` query and its parameters.
+    """
+
+    query = OPERATIONS["get_revenue"].query
+    params = {
+        "uname": f"{subaccount}",
+        "cid": mpn,
+        "startInterval": json.loads(start_interval),
+        "endInterval": json.loads(end_interval),
+    }
+
+    return query, params
+
+
+@command
 def get_revenue(
     subaccount: str,
     mpn: str,
@@ -400,20 +719,38 @@ def get_revenue(
     end_interval (str): string JSON representation of an interval of time that has passed
     """
 
-    query = """query getRevenue($uname: String!, $cid: CurrencyProfileName!, $startInterval: IntervalInput!, $endInterval: IntervalInput!) {
-                getRevenue(uname: $uname, cid: $cid, startInterval: $startInterval, endInterval: $endInterval)
-            }"""
-    params = {
-        "uname": f"{subaccount}",
-        "cid": mpn,
-        "startInterval": json.loads(start_interval),
-        "endInterval": json.loads(end_interval),
-    }
+    return get_client().request(
+        *build_get_revenue(subaccount, mpn, start_interval, end_interval),
+    )
+
+
+async def get_revenue_async(
+    subaccount: str,
+    mpn: str,
+    start_interval: str,
+    end_interval: str,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_revenue`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_revenue(subaccount, mpn, start_interval, end_interval),
+    )
 
-    return CLIENT.request(query, params)
 
+def build_get_profile_active_worker_count(mpn: str) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getUserMinersStatusCount` query and its parameters.
+    """
 
-@app.command()
+    query = OPERATIONS["get_profile_active_worker_count"].query
+    params = {"mpn": mpn}
+
+    return query, params
+
+
+@command
 def get_profile_active_worker_count(mpn: str) -> dict[str, Any]:
     """
     Returns an integer count of distinct Profile active workers.
@@ -422,16 +759,29 @@ def get_profile_active_worker_count(mpn: str) -> dict[str, Any]:
     mpn (str): mining profile name, refers to the coin ticker
     """
 
-    query = """query getUserMinersStatusCount {
-                getUserMinersStatusCount(mpn: BTC)
-            }
-        """
+    return get_client().request(*build_get_profile_active_worker_count(mpn))
+
+
+async def get_profile_active_worker_count_async(mpn: str) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_profile_active_worker_count`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(*build_get_profile_active_worker_count(mpn))
+
+
+def build_get_profile_inactive_worker_count(mpn: str) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getInactiveWorkers` query and its parameters.
+    """
+
+    query = OPERATIONS["get_profile_inactive_worker_count"].query
     params = {"mpn": mpn}
 
-    return CLIENT.request(query, params)
+    return query, params
 
 
-@app.command()
+@command
 def get_profile_inactive_worker_count(mpn: str) -> dict[str, Any]:
     """
     Returns an integer count of distinct Profile inactive workers.
@@ -440,20 +790,41 @@ def get_profile_inactive_worker_count(mpn: str) -> dict[str, Any]:
     mpn (str): Mining profile name, refers to the coin ticker
     """
 
-    query = """query getInactiveWorkers {
-                getProfileInactiveWorkers(mpn: BTC)
-            }
-        """
-    params = {"mpn": mpn}
+    return get_client().request(*build_get_profile_inactive_worker_count(mpn))
+
+
+async def get_profile_inactive_worker_count_async(mpn: str) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_profile_inactive_worker_count`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_profile_inactive_worker_count(mpn),
+    )
 
-    return CLIENT.request(query, params)
 
+def build_get_transaction_history(
+    subaccount: str,
+    cid: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getTransactionHistory` query and its parameters.
+    """
+
+    query = project("get_transaction_history", fields)
+    params = {"uname": f"{subaccount}", "cid": cid, "first": first}
+
+    return query, params
 
-@app.command()
+
+@command
 def get_transaction_history(
     subaccount: str,
     cid: str,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     Returns on-chain transactions for a subaccount and currency combo.
@@ -461,30 +832,52 @@ def get_transaction_history(
     subaccount (str): Subaccount username
     cid (str): Currency identifier, refers to the coin ticker
     first (int): Limits the number of data points returned
+    fields (list): Subset of the fields to request, in order, defaults to all of them
     """
 
-    query = """query getTransactionHistory($uname: String!, $cid: CurrencyProfileName!, $first: Int) {
-                getTransactionHistory(uname: $uname, cid: $cid, first: $first, orderBy: CREATED_AT_DESC) {
-                    edges {
-                    node {
-                        createdAt
-                        amount
-                        status
-                        transactionId
-                    }
-                    }
-                }
-            }"""
-    params = {"uname": f"{subaccount}", "cid": cid, "first": first}
+    return get_client().request(
+        *build_get_transaction_history(subaccount, cid, first, fields),
+    )
+
+
+async def get_transaction_history_async(
+    subaccount: str,
+    cid: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_transaction_history`, executed with the shared `ASYNC_CLIENT`.
+    """
 
-    return CLIENT.request(query, params)
+    return await get_async_client().request(
+        *build_get_transaction_history(subaccount, cid, first, fields),
+    )
+
+
+def build_get_hashrate_score_history(
+    subaccount: str,
+    mpn: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getHashrateScoreHistory` query and its parameters.
+    """
+
+    query = project("get_hashrate_score_history", fields)
+
+    params = {"uname": f"{subaccount}", "mpn": mpn, "first": first}
 
+    return query, params
 
-@app.command()
+
+@command
 def get_hashrate_score_history(
     subaccount: str,
     mpn: str,
     first: int,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
 
@@ -494,28 +887,45 @@ def get_hashrate_score_history(
         subaccount (str): Subaccount username
         mpn (str): Mining profile name, refers to the coin ticker
         first (int): Limits the number of data points returned
+        fields (list): Subset of the fields to request, in order, defaults to all of them
 
     Returns:
         dict[str, Any]: JSON response of the graphql query
     """
 
-    query = """ query getHashrateScoreHistory($mpn: MiningProfileName!, $uname: String!, $first : Int) {
-                getHashrateScoreHistory(mpn: $mpn, uname: $uname, first: $first, orderBy: DATE_DESC) {
-                    nodes {
-                        date
-                        hashrate
-                        efficiency
-                        revenue
-                        }
-                    }
-                }"""
+    return get_client().request(
+        *build_get_hashrate_score_history(subaccount, mpn, first, fields),
+    )
+
 
-    params = {"uname": f"{subaccount}", "mpn": mpn, "first": first}
+async def get_hashrate_score_history_async(
+    subaccount: str,
+    mpn: str,
+    first: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_hashrate_score_history`, executed with the shared `ASYNC_CLIENT`.
+    """
+
+    return await get_async_client().request(
+        *build_get_hashrate_score_history(subaccount, mpn, first, fields),
+    )
+
+
+def build_get_revenue_ph(mpn: str) -> tuple[str, dict[str, Any]]:
+    """
+    Returns the `getRevenuePh` query and its parameters.
+    """
+
+    query = OPERATIONS["get_revenue_ph"].query
+
+    params = {"mpn": mpn}
 
-    return CLIENT.request(query, params)
+    return query, params
 
 
-@app.command()
+@command
 def get_revenue_ph(mpn: str) -> dict[str, Any]:
     """
 
@@ -528,17 +938,255 @@ def get_revenue_ph(mpn: str) -> dict[str, Any]:
         dict[str, Any]: JSON response of the graphql query
     """
 
-    query = """query getRevenuePh($mpn: MiningProfileName!) {
-                getRevenuePh(mpn: $mpn)
-            }
+    return get_client().request(*build_get_revenue_ph(mpn))
+
+
+async def get_revenue_ph_async(mpn: str) -> dict[str, Any]:
+    """
+    Awaitable variant of `get_revenue_ph`, executed with the shared `ASYNC_CLIENT`.
     """
 
-    params = {"mpn": mpn}
+    return await get_async_client().request(*build_get_revenue_ph(mpn))
+
+
+@command
+def sync_hashrate_score_history(
+    subaccount: str,
+    mpn: str,
+    db: str = "luxor.db",
+    page_size: int = 100,
+) -> int:
+    """
+    Syncs a subaccount hashrate score history into a local SQLite store, fetching only the days not stored yet.
+
+    subaccount (str): Subaccount username
+    mpn (str): Mining profile name, refers to the coin ticker
+    db (str): SQLite database file
+    page_size (int): Number of data points requested per page
+    """
+
+    from store import SyncStore
+
+    with SyncStore(db) as store:
+        written = store.sync(
+            get_client(),
+            *build_get_hashrate_score_history(subaccount, mpn, page_size),
+            endpoint="getHashrateScoreHistory",
+            subaccount=subaccount,
+            key=mpn,
+            page_size=page_size,
+        )
+
+    _synced(written, db)
+    return written
+
+
+@command
+def sync_all_transaction_history(
+    mpn: str,
+    subaccount: str,
+    db: str = "luxor.db",
+    page_size: int = 100,
+) -> int:
+    """
+    Syncs all the transaction history of a subaccount into a local SQLite store, fetching only new transactions.
+
+    mpn (str): mining profile name, refers to the coin ticker
+    subaccount (str): subaccount username
+    db (str): SQLite database file
+    page_size (int): Number of data points requested per page
+    """
+
+    from store import SyncStore
 
-    return CLIENT.request(query, params)
+    with SyncStore(db) as store:
+        written = store.sync(
+            get_client(),
+            *build_get_all_transaction_history(mpn, subaccount, page_size),
+            endpoint="getAllTransactionHistory",
+            subaccount=subaccount,
+            key=mpn,
+            page_size=page_size,
+        )
 
+    _synced(written, db)
+    return written
 
-@app.command()
+
+@command
+def sync_transaction_history(
+    subaccount: str,
+    cid: str,
+    db: str = "luxor.db",
+    page_size: int = 100,
+) -> int:
+    """
+    Syncs on-chain transactions for a subaccount and currency combo into a local SQLite store, fetching only new transactions.
+
+    subaccount (str): Subaccount username
+    cid (str): Currency identifier, refers to the coin ticker
+    db (str): SQLite database file
+    page_size (int): Number of data points requested per page
+    """
+
+    from store import SyncStore
+
+    with SyncStore(db) as store:
+        written = store.sync(
+            get_client(),
+            *build_get_transaction_history(subaccount, cid, page_size),
+            endpoint="getTransactionHistory",
+            subaccount=subaccount,
+            key=cid,
+            page_size=page_size,
+        )
+
+    _synced(written, db)
+    return written
+
+
+@command
+def sync_worker_hashrate_history(
+    subaccount: str,
+    workername: str,
+    mpn: str,
+    input_bucket: str,
+    input_duration: str,
+    db: str = "luxor.db",
+    page_size: int = 100,
+) -> int:
+    """
+    Syncs a miner hashrate timeseries into a local SQLite store, writing only the points not stored yet.
+
+    subaccount (str): subaccount username
+    workername (str): rig identifier
+    mpn (str): mining profile name, refers to the coin ticker
+    input_bucket (str): intervals to generate the timeseries, options are: `_15_MINUTE`, `_1_HOUR`, `_6_HOUR` and `_1_DAY`
+    input_duration (str): intervals to generate the timeseries, options are: `_15_MINUTE`, `_1_HOUR`, `_6_HOUR` and `_1_DAY`
+    db (str): SQLite database file
+    page_size (int): Number of data points requested per page
+    """
+
+    from store import SyncStore
+
+    with SyncStore(db) as store:
+        written = store.sync(
+            get_client(),
+            *build_get_worker_hashrate_history(
+                subaccount,
+                workername,
+                mpn,
+                input_bucket,
+                input_duration,
+                page_size,
+            ),
+            endpoint="getWorkerHashrateHistory",
+            subaccount=subaccount,
+            key=mpn,
+            worker=workername,
+            page_size=page_size,
+        )
+
+    _synced(written, db)
+    return written
+
+
+@command
+def export_fleet(
+    mpn: str,
+    root: str = "export",
+    minutes: int = 60,
+    page_size: int = 1000,
+    fetch_workers: int = 8,
+    processes: int = 0,
+    queue_size: int = 32,
+    file_format: str = "csv",
+) -> dict[str, Any]:
+    """
+    Exports the worker details and hashrate score history of every subaccount as CSV (or Parquet) files partitioned by subaccount, with a run summary.
+
+    mpn (str): mining profile name, refers to the coin ticker
+    root (str): output directory
+    minutes (int): minutes lookback of the worker details
+    page_size (int): number of items requested per page
+    fetch_workers (int): number of threads fetching pages
+    processes (int): number of processes resolving and writing pages, 0 for one per CPU
+    queue_size (int): maximum number of fetched pages waiting to be written
+    file_format (str): file format, csv or parquet
+    """
+
+    from rich import print
+
+    from export import export_fleet as run_export
+
+    summary = run_export(
+        get_client(),
+        mpn,
+        root,
+        minutes=minutes,
+        page_size=page_size,
+        fetch_workers=fetch_workers,
+        processes=processes or None,
+        queue_size=queue_size,
+        file_format=file_format,
+    )
+
+    write = summary["stages"]["write"]
+    print(
+        f"[bold green]{write['rows']}[/bold green] rows of {summary['subaccounts']} subaccounts exported into {root} in {summary['seconds']}s",
+    )
+    if summary["errors"]:
+        print(
+            f"[bold red]{len(summary['errors'])}[/bold red] errors, see {root}/summary.json",
+        )
+    return summary
+
+
+@command
+def watch(
+    subaccount: str,
+    mpn: str,
+    minutes: int = 15,
+    interval: float = 60.0,
+    threshold: float = 0.1,
+    counts: bool = False,
+    polls: int = 0,
+) -> None:
+    """
+    Polls the workers of a subaccount and prints one NDJSON line per change: status flips, hashrate moves and workers appearing or disappearing.
+
+    subaccount (str): subaccount username
+    mpn (str): mining profile name, refers to the coin ticker
+    minutes (int): minutes lookback of the worker metrics
+    interval (float): seconds between two polls
+    threshold (float): relative hashrate change reported, e.g. 0.1 for 10%
+    counts (bool): also report changes of the dead, warning and active worker counts
+    polls (int): stop after this many polls, 0 to poll until interrupted
+    """
+
+    import sys
+
+    from watch import watch as watch_workers
+
+    events = watch_workers(
+        get_client(),
+        subaccount,
+        mpn,
+        minutes=minutes,
+        interval=interval,
+        threshold=threshold,
+        counts=counts,
+        polls=polls or None,
+    )
+    try:
+        for event in events:
+            sys.stdout.write(json.dumps(event, separators=(",", ":")) + "\n")
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+
+@command
 def create_custom_request(query: str, params: str) -> dict[str, Any]:
     """
 
@@ -552,7 +1200,91 @@ def create_custom_request(query: str, params: str) -> dict[str, Any]:
         dict[str, Any]: JSON response of the graphql query.
     """
 
-    return CLIENT.request(query, json.loads(params))
+    return get_client().request(query, json.loads(params))
+
+
+def _renderer(output: str, max_rows: int | None) -> Callable[[dict[str, Any]], None]:
+    """
+    Returns a sink rendering results with a TableRenderer, only created (and rich
+    only imported) once there is a result to render.
+    """
+
+    renderer: Callable[[dict[str, Any]], None] | None = None
+
+    def sink(json_result: dict[str, Any]) -> None:
+        nonlocal renderer
+        if renderer is None:
+            from render import TableRenderer
+
+            renderer = TableRenderer(output, max_rows)
+        renderer(json_result)
+
+    return sink
+
+
+def app() -> None:
+    """
+    Runs the command line client. Heavy modules and the process wide configuration
+    (.env file, logging to requests.log) are only loaded here, not on import, and
+    only by the commands and options needing them.
+    """
+
+    import typer
+
+    from render import MODES
+
+    if None in _environment():
+        from rich import print
+
+        print("[bold red]Alert![/bold red] It seems you have not setup your .env file.")
+        print(
+            "Please copy the [bold].env.example[/bold] with the name of [bold green].env[/bold green] and write your own values",
+        )
+        exit(1)
+
+    cli = typer.Typer()
+
+    @cli.callback()
+    def main(
+        output: str = typer.Option(
+            "table",
+            help=f"How results are rendered, options are: {', '.join(MODES)} and none",
+        ),
+        max_rows: int = typer.Option(
+            0,
+            help="Maximum number of rows rendered, 0 for all",
+        ),
+        verbose: bool = typer.Option(
+            False,
+            help="Log a record of every request to requests.log",
+        ),
+        log_sample: float = typer.Option(
+            1.0,
+            help="Fraction of the successful requests logged with --verbose",
+        ),
+    ) -> None:
+        """
+        Luxor's GraphQL API command line client.
+        """
+
+        if output != "none" and output not in MODES:
+            raise typer.BadParameter(
+                f"options are: {', '.join(MODES)} and none",
+                param_hint="--output",
+            )
+        client = get_client()
+        client.verbose = verbose
+        client.sink = None if output == "none" else _renderer(output, max_rows or None)
+        if verbose:
+            from logs import configure
+
+            configure("requests.log", sample=log_sample)
+
+    for function in COMMANDS:
+        cli.command()(function)
+
+    with get_client():
+        cli()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from functools import lru_cache
+from typing import Any
+from typing import Iterable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+    import aiohttp
+    from requests.adapters import HTTPAdapter
+
+# connect: opening a new connection, TLS included. Missing when a pooled one is reused.
+# ttfb: from the request being sent to the response headers.
+# download: reading the response body.
+# decode: parsing the JSON body.
+# resolve: formatting a response with RESOLVERS.
+# render: handing the response to the client `sink`.
+# total: the whole call, retries and waits on the rate limiter included.
+PHASES = ("connect", "ttfb", "download", "decode", "resolve", "render", "total")
+
+# seconds, from a cached answer to a slow page of a large connection
+BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class RequestTiming:
+    """
+    Timings of one call, handed to a `metrics` callback once the call returned or
+    failed. Phases the call did not go through are missing from `phases`, e.g.
+    everything but `render` and `total` for an answer served by the cache.
+
+    operation : GraphQL operation name, or RESOLVERS method name for `resolve`.
+    status : "ok", "cached", or the name of the exception raised.
+    phases : seconds spent per phase of `PHASES`, network ones are the last attempt's.
+    sent : bytes of request bodies sent, every attempt included.
+    received : bytes of response bodies received, every attempt included.
+    attempts : HTTP requests sent.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.status = "ok"
+        self.phases: dict[str, float] = {}
+        self.sent = 0
+        self.received = 0
+        self.attempts = 0
+        self._start = time.perf_counter()
+
+    def __repr__(self) -> str:
+        phases = ", ".join(f"{k}={v * 1e3:.2f}ms" for k, v in self.phases.items())
+        return f"RequestTiming({self.operation!r}, {self.status}, {phases})"
+
+    def attempt(
+        self,
+        connect: float | None,
+        ttfb: float,
+        download: float,
+        sent: int,
+        received: int,
+    ) -> None:
+        """
+        Records one HTTP request of the call.
+        """
+
+        self.attempts += 1
+        self.sent += sent
+        self.received += received
+        if connect is not None:
+            self.phases["connect"] = connect
+        else:
+            self.phases.pop("connect", None)
+        self.phases["ttfb"] = ttfb
+        self.phases["download"] = download
+
+    def merge(self, other: RequestTiming) -> None:
+        """
+        Adds the attempts recorded by `other`, e.g. the hedged attempt that won.
+        """
+
+        self.attempts += other.attempts
+        self.sent += other.sent
+        self.received += other.received
+        self.phases.update(other.phases)
+
+    def finish(self, status: str = "ok") -> None:
+        self.status = status
+        self.phases["total"] = time.perf_counter() - self._start
+
+
+class Histogram:
+    """
+    Prometheus-style histogram: observations counted per upper bound of `buckets`.
+    """
+
+    def __init__(self, buckets: Iterable[float] = BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # the last count is for observations above every bucket (le="+Inf")
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """
+        Returns (upper bound, observations below it) pairs, as exported to Prometheus.
+        """
+
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return pairs
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Upper bound of the bucket holding the `q` quantile, None without observations.
+        """
+
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class Metrics:
+    """
+    Aggregates RequestTimings into in-process histograms per operation and phase,
+    plus counters of calls and bytes. An instance is a `metrics` callback, share
+    one between clients and RESOLVERS to see where the time goes:
+
+        metrics = Metrics()
+        client = GraphQlClient(host, key, "POST", metrics=metrics)
+        resolvers = RESOLVERS(df=True, metrics=metrics)
+        ...
+        print(metrics.prometheus())
+
+    Thread safe.
+    """
+
+    def __init__(self, buckets: Iterable[float] = BUCKETS):
+        """
+        Parameters
+        ----------
+        buckets : iterable of float
+            Upper bounds of the histogram buckets, in seconds. Default is `BUCKETS`.
+        """
+
+        self.buckets = tuple(buckets)
+        self.durations: dict[tuple[str, str], Histogram] = {}
+        self.calls: dict[tuple[str, str], int] = {}
+        self.sent: dict[str, int] = {}
+        self.received: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, timing: RequestTiming) -> None:
+        operation = timing.operation
+        with self._lock:
+            for phase, seconds in timing.phases.items():
+                histogram = self.durations.get((operation, phase))
+                if histogram is None:
+                    histogram = self.durations[operation, phase] = Histogram(
+                        self.buckets,
+                    )
+                histogram.observe(seconds)
+            key = (operation, timing.status)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            if timing.attempts:
+                self.sent[operation] = self.sent.get(operation, 0) + timing.sent
+                self.received[operation] = (
+                    self.received.get(operation, 0) + timing.received
+                )
+
+    def summary(self) -> list[dict[str, Any]]:
+        """
+        Returns the count, total and approximate p50/p95 seconds of every operation
+        and phase, the most time consuming first.
+        """
+
+        with self._lock:
+            rows = [
+                {
+                    "operation": operation,
+                    "phase": phase,
+                    "count": histogram.count,
+                    "seconds": histogram.sum,
+                    "mean": histogram.sum / histogram.count,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                }
+                for (operation, phase), histogram in self.durations.items()
+            ]
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def prometheus(self, namespace: str = "luxor_graphql") -> str:
+        """
+        Returns every metric in the Prometheus text exposition format, e.g. to
+        serve on a /metrics endpoint or write for node_exporter's textfile collector.
+        """
+
+        lines = [
+            f"# HELP {namespace}_phase_seconds Time spent per phase of GraphQL calls.",
+            f"# TYPE {namespace}_phase_seconds histogram",
+        ]
+        with self._lock:
+            for (operation, phase), histogram in sorted(self.durations.items()):
+                for bound, total in histogram.cumulative():
+                    labels = _labels(operation=operation, phase=phase, le=bound)
+                    lines.append(f"{namespace}_phase_seconds_bucket{labels} {total}")
+                labels = _labels(operation=operation, phase=phase)
+                lines.append(f"{namespace}_phase_seconds_sum{labels} {histogram.sum!r}")
+                lines.append(
+                    f"{namespace}_phase_seconds_count{labels} {histogram.count}",
+                )
+
+            lines += [
+                f"# HELP {namespace}_calls_total GraphQL calls per final status.",
+                f"# TYPE {namespace}_calls_total counter",
+            ]
+            for (operation, status), count in sorted(self.calls.items()):
+                labels = _labels(operation=operation, status=status)
+                lines.append(f"{namespace}_calls_total{labels} {count}")
+
+            for name, counter, description in (
+                ("sent", self.sent, "Bytes of request bodies sent."),
+                ("received", self.received, "Bytes of response bodies received."),
+            ):
+                lines += [
+                    f"# HELP {namespace}_{name}_bytes_total {description}",
+                    f"# TYPE {namespace}_{name}_bytes_total counter",
+                ]
+                for operation, size in sorted(counter.items()):
+                    labels = _labels(operation=operation)
+                    lines.append(f"{namespace}_{name}_bytes_total{labels} {size}")
+        return "\n".join(lines) + "\n"
+
+
+_local = threading.local()
+
+
+def pop_connect() -> float | None:
+    """
+    Returns the seconds spent opening connections on this thread since the last
+    call, None if none was opened. Fed by the adapter of `timed_adapter`.
+    """
+
+    seconds: float | None = getattr(_local, "connect", None)
+    _local.connect = None
+    return seconds
+
+
+@lru_cache(maxsize=None)
+def _timed_pools() -> dict[str, type[Any]]:
+    from urllib3.connection import HTTPConnection
+    from urllib3.connection import HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool
+    from urllib3.connectionpool import HTTPSConnectionPool
+
+    def timed(connection: type[Any]) -> type[Any]:
+        class TimedConnection(connection):  # type: ignore
+            def connect(self) -> None:
+                start = time.perf_counter()
+                try:
+                    super().connect()
+                finally:
+                    elapsed = time.perf_counter() - start
+                    _local.connect = (getattr(_local, "connect", None) or 0.0) + elapsed
+
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    return {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+@lru_cache(maxsize=None)
+def timed_adapter() -> type[HTTPAdapter]:
+    """
+    Returns a requests HTTPAdapter subclass timing every connection it opens, see
+    `pop_connect`. Built on first use so requests is only imported when needed.
+    """
+
+    from requests.adapters import HTTPAdapter
+
+    class TimedAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = _timed_pools()
+
+    return TimedAdapter
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """
+    Returns an aiohttp TraceConfig timing the connections opened for a request into
+    the dictionary passed as its `trace_request_ctx`, under "connect".
+    """
+
+    import aiohttp
+
+    async def started(
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceConnectionCreateStartParams,
+    ) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def opened(
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceConnectionCreateEndParams,
+    ) -> None:
+        if context.trace_request_ctx is not None:
+            elapsed = time.perf_counter() - context.connect_start
+            phases = context.trace_request_ctx
+            phases["connect"] = phases.get("connect", 0.0) + elapsed
+
+    config = aiohttp.TraceConfig()
+    config.on_connection_create_start.append(started)
+    config.on_connection_create_end.append(opened)
+    return config
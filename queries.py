@@ -0,0 +1,479 @@
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from typing import Any
+from typing import NamedTuple
+from typing import Sequence
+
+from document import join
+from document import minify
+from document import Token
+from document import tokenize
+
+
+class Operation(NamedTuple):
+    """
+    A named GraphQL operation, minified and hashed once at import.
+
+    name : registry key, the luxor.py wrapper sending it.
+    query : minified document, the exact text sent to the API.
+    sha256 : hex digest of `query`, its id for Automatic Persisted Queries.
+    fields : leaf fields callers may project the query on, e.g. `details1H.status`.
+    """
+
+    name: str
+    query: str
+    sha256: str
+    fields: tuple[str, ...] = ()
+
+
+OPERATIONS: dict[str, Operation] = {}
+_HASHES: dict[str, str] = {}
+# tokens before and after the projectable selection set of each operation
+_TEMPLATES: dict[str, tuple[list[Token], list[Token]]] = {}
+
+
+def _closing(tokens: list[Token], start: int) -> int:
+    """
+    Returns the index of the bracket closing the one at `start`.
+    """
+
+    opening = tokens[start].value
+    closing = {"(": ")", "{": "}"}[opening]
+    depth = 0
+    for index in range(start, len(tokens)):
+        if tokens[index].kind != "punctuator":
+            continue
+        if tokens[index].value == opening:
+            depth += 1
+        elif tokens[index].value == closing:
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError(f"Unbalanced {opening!r}")
+
+
+def _span(tokens: list[Token], field: str) -> tuple[int, int]:
+    """
+    Returns the indexes of the braces around the selection set of the first `field`.
+    """
+
+    # skip the operation name and variables, e.g. `query getMiningSummary(...)`
+    body = next(index for index, token in enumerate(tokens) if token.value == "{")
+    for index, token in enumerate(tokens[body:], body):
+        if token != ("name", field):
+            continue
+        position = index + 1
+        if position < len(tokens) and tokens[position].value == "(":
+            position = _closing(tokens, position) + 1
+        if position < len(tokens) and tokens[position].value == "{":
+            return position, _closing(tokens, position)
+    raise ValueError(f"{field!r} has no selection set")
+
+
+def _leaves(tokens: list[Token]) -> tuple[str, ...]:
+    """
+    Returns the path of every leaf field of a selection set, e.g. `details1H.status`.
+    """
+
+    paths: list[str] = []
+    prefix: list[str] = []
+    for index, token in enumerate(tokens):
+        if token.value == "}":
+            prefix.pop()
+        elif token.kind == "name":
+            if index + 1 < len(tokens) and tokens[index + 1].value == "{":
+                prefix.append(token.value)
+            else:
+                paths.append(".".join([*prefix, token.value]))
+    return tuple(paths)
+
+
+def _selection(tree: dict[str, Any]) -> list[Token]:
+    tokens: list[Token] = []
+    for name, children in tree.items():
+        tokens.append(Token("name", name))
+        if children:
+            tokens += [Token("punctuator", "{"), *_selection(children)]
+            tokens.append(Token("punctuator", "}"))
+    return tokens
+
+
+def register(name: str, query: str, selection: str | None = None) -> Operation:
+    """
+    Minifies, hashes and registers an operation under `name`.
+
+    selection (str): field whose selection set callers may project, see `project`.
+    """
+
+    text = minify(query)
+    fields: tuple[str, ...] = ()
+    if selection is not None:
+        tokens = tokenize(text)
+        start, end = _span(tokens, selection)
+        _TEMPLATES[name] = (tokens[: start + 1], tokens[end:])
+        fields = _leaves(tokens[start + 1 : end])
+
+    operation = Operation(
+        name,
+        text,
+        hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        fields,
+    )
+    OPERATIONS[name] = operation
+    _HASHES[text] = operation.sha256
+    return operation
+
+
+def select(name: str, fields: Sequence[str] | None = None) -> list[str]:
+    """
+    Returns the leaf fields of an operation picked by `fields`, in the order given.
+    A nested object, e.g. `details1H`, picks all its fields. Raises ValueError for
+    fields the operation does not select.
+
+    name (str): registry key of the operation.
+    fields (list): fields to keep. Defaults to all of them.
+    """
+
+    available = OPERATIONS[name].fields
+    if fields is None:
+        return list(available)
+    if not available:
+        raise ValueError(f"{name} cannot be projected")
+    if not fields:
+        raise ValueError(f"{name} needs at least one field")
+
+    selected: list[str] = []
+    for field in fields:
+        matches = [
+            path for path in available if path == field or path.startswith(f"{field}.")
+        ]
+        if not matches:
+            raise ValueError(
+                f"{name} has no field {field!r}, options are: {', '.join(available)}",
+            )
+        selected += [path for path in matches if path not in selected]
+    return selected
+
+
+def project(name: str, fields: Sequence[str] | None = None) -> str:
+    """
+    Returns the query of an operation selecting only `fields`, see `select`. Smaller
+    selections mean smaller payloads, less work for the API and faster parsing.
+    Each projection is built and hashed once, then served from memory.
+
+    name (str): registry key of the operation.
+    fields (list): fields to request. Defaults to all of them, i.e. the registered query.
+    """
+
+    if fields is None:
+        return OPERATIONS[name].query
+    return _project(name, tuple(select(name, fields)))
+
+
+@lru_cache(maxsize=256)
+def _project(name: str, fields: tuple[str, ...]) -> str:
+    if fields == OPERATIONS[name].fields:
+        return OPERATIONS[name].query
+
+    tree: dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        for key in field.split("."):
+            node = node.setdefault(key, {})
+
+    head, tail = _TEMPLATES[name]
+    text = join([*head, *_selection(tree), *tail])
+    _HASHES[text] = _sha256(text)
+    return text
+
+
+@lru_cache(maxsize=256)
+def _sha256(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def persisted_hash(query: str) -> str:
+    """
+    Returns the Automatic Persisted Queries hash of a query: precomputed for
+    registered operations, computed and memoized for any other one.
+    """
+
+    return _HASHES.get(query) or _sha256(query)
+
+
+register(
+    "get_all_transaction_history",
+    """query getAllTransactionHistory($cid: CurrencyProfileName!, $uname: String!, $first: Int, $after: Cursor) {
+        getAllTransactionHistory(cid: $cid, uname: $uname, first: $first, after: $after, orderBy: CREATED_AT_DESC) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            edges {
+                node {
+                    transactionId
+                    amount
+                    status
+                    payoutAddress
+                    currency
+                    createdAt
+                }
+            }
+        }
+    }
+    """,
+    selection="node",
+)
+
+register(
+    "get_subaccounts",
+    """query getSubaccounts($first: Int, $offset: Int, $after: Cursor) {users(first: $first, offset: $offset, after: $after) {pageInfo {hasNextPage endCursor} edges {node {username}}}}""",
+)
+
+register(
+    "get_subaccount_mining_summary",
+    """query getMiningSummary($mpn: MiningProfileName!, $userName: String!, $inputDuration: HashrateIntervals!) {
+                    getMiningSummary(mpn: $mpn, userName: $userName, inputDuration: $inputDuration) {
+                        hashrate
+                        validShares
+                        invalidShares
+                        staleShares
+                        badShares
+                        lowDiffShares
+                        revenue
+                }
+            }
+    """,
+    selection="getMiningSummary",
+)
+
+register(
+    "get_subaccount_hashrate_history",
+    """query getHashrateHistory($inputUsername: String, $mpn: MiningProfileName, $inputInterval: HashrateIntervals, $first: Int, $after: Cursor) {
+        getHashrateHistory(inputUsername: $inputUsername, mpn: $mpn, inputInterval: $inputInterval, first: $first, after: $after) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            edges {
+                node {
+                    time
+                    hashrate
+                }
+            }
+        }
+    }""",
+    selection="node",
+)
+
+register(
+    "get_worker_details",
+    """query getWorkerDetails($duration: IntervalInput!, $mpn: MiningProfileName!, $uname: String!, $first: Int, $after: Cursor) {
+                    getWorkerDetails(
+                        duration: $duration
+                        mpn: $mpn
+                        uname: $uname
+                        first: $first
+                        after: $after
+                    ) {
+                        pageInfo {
+                            hasNextPage
+                            endCursor
+                        }
+                        edges {
+                        node {
+                            workerName
+                            hashrate
+                            validShares
+                            staleShares
+                            badShares
+                            duplicateShares
+                            invalidShares
+                            lowDiffShares
+                            efficiency
+                            revenue
+                            status
+                            updatedAt
+                        }
+                        }
+                    }
+                }""",
+    selection="node",
+)
+
+register(
+    "get_worker_details_1H",
+    """query getWorkersOverview($mpn: MiningProfileName, $username: String, $first: Int, $after: Cursor) {
+                miners(filter: {
+                        miningProfileName: { equalTo: $mpn }
+                        user: { username: { equalTo: $username } }
+                }, first: $first, after: $after) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    edges {
+                    node {
+                        workerName
+                        details1H {
+                            hashrate
+                            status
+                            efficiency
+                            validShares
+                            staleShares
+                            badShares
+                            duplicateShares
+                            invalidShares
+                            lowDiffShares
+                        }
+                    }
+                }
+            }
+        }""",
+    selection="node",
+)
+
+register(
+    "get_worker_details_24H",
+    """query getWorkersOverview($mpn: MiningProfileName, $username: String, $first: Int, $after: Cursor) {
+                miners(filter: {
+                        miningProfileName: { equalTo: $mpn }
+                        user: { username: { equalTo: $username } }
+                }, first: $first, after: $after) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    edges {
+                    node {
+                        workerName
+                        details24H {
+                            hashrate
+                            status
+                            efficiency
+                            validShares
+                            staleShares
+                            badShares
+                            duplicateShares
+                            invalidShares
+                            lowDiffShares
+                        }
+                    }
+                }
+            }
+        }""",
+    selection="node",
+)
+
+register(
+    "get_worker_hashrate_history",
+    """query getWorkerHashrateHistory($inputUsername: String!, $workerName: String!, $mpn: MiningProfileName!, $inputBucket: HashrateIntervals!, $inputDuration: HashrateIntervals!, $first: Int, $after: Cursor) {
+                getWorkerHashrateHistory(username: $inputUsername, workerName: $workerName, mpn: $mpn, inputBucket: $inputBucket, inputDuration: $inputDuration, first: $first, after: $after) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    edges {
+                        node {
+                            time
+                            hashrate
+                        }
+                    }
+                }
+            }""",
+    selection="node",
+)
+
+register(
+    "get_subaccount_workers_status",
+    """query getUserMinersStatusCount($usrname: String!, $mpn: MiningProfileName!) {
+                getUserMinersStatusCount(usrname: $usrname, mpn: $mpn) {
+                    dead
+                    warning
+                    active
+                }
+            }
+    """,
+    selection="getUserMinersStatusCount",
+)
+
+register(
+    "get_pool_hashrate",
+    """query getPoolHashrate {
+                getPoolHashrate(mpn: BTC, orgSlug: "luxor")
+            }
+        """,
+)
+
+register(
+    "get_revenue",
+    """query getRevenue($uname: String!, $cid: CurrencyProfileName!, $startInterval: IntervalInput!, $endInterval: IntervalInput!) {
+                getRevenue(uname: $uname, cid: $cid, startInterval: $startInterval, endInterval: $endInterval)
+            }""",
+)
+
+register(
+    "get_profile_active_worker_count",
+    """query getUserMinersStatusCount {
+                getUserMinersStatusCount(mpn: BTC)
+            }
+        """,
+)
+
+register(
+    "get_profile_inactive_worker_count",
+    """query getInactiveWorkers {
+                getProfileInactiveWorkers(mpn: BTC)
+            }
+        """,
+)
+
+register(
+    "get_transaction_history",
+    """query getTransactionHistory($uname: String!, $cid: CurrencyProfileName!, $first: Int, $after: Cursor) {
+                getTransactionHistory(uname: $uname, cid: $cid, first: $first, after: $after, orderBy: CREATED_AT_DESC) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    edges {
+                    node {
+                        createdAt
+                        amount
+                        status
+                        transactionId
+                    }
+                    }
+                }
+            }""",
+    selection="node",
+)
+
+register(
+    "get_hashrate_score_history",
+    """ query getHashrateScoreHistory($mpn: MiningProfileName!, $uname: String!, $first: Int, $after: Cursor) {
+                getHashrateScoreHistory(mpn: $mpn, uname: $uname, first: $first, after: $after, orderBy: DATE_DESC) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    nodes {
+                        date
+                        hashrate
+                        efficiency
+                        revenue
+                        }
+                    }
+                }""",
+    selection="nodes",
+)
+
+register(
+    "get_revenue_ph",
+    """query getRevenuePh($mpn: MiningProfileName!) {
+                getRevenuePh(mpn: $mpn)
+            }
+    """,
+)
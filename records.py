@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from typing import Iterator
+
+# Typed rows returned by `RESOLVERS` when neither `df` nor `arrow` is set.
+# They use __slots__, so a row costs a fixed few words instead of a dict, and
+# fields are read by name whatever order the server sends them in. Every field
+# defaults to None so a record can be built from a query selecting only some of them.
+
+
+@dataclass(slots=True)
+class WorkerDetail:
+    workerName: str | None = None
+    hashrate: int | None = None
+    validShares: int | None = None
+    staleShares: int | None = None
+    badShares: int | None = None
+    duplicateShares: int | None = None
+    invalidShares: int | None = None
+    lowDiffShares: int | None = None
+    efficiency: float | None = None
+    revenue: float | None = None
+    status: str | None = None
+    updatedAt: str | None = None
+
+
+@dataclass(slots=True)
+class HashratePoint:
+    timestamp: str | None = None
+    hashrate: int | None = None
+
+
+@dataclass(slots=True)
+class Transaction:
+    transactionId: str | None = None
+    amount: float | None = None
+    status: str | None = None
+    payoutAddress: str | None = None
+    currency: str | None = None
+    createdAt: str | None = None
+
+
+@dataclass(slots=True)
+class HashrateScore:
+    date: str | None = None
+    hashrate: int | None = None
+    efficiency: float | None = None
+    revenue: float | None = None
+
+
+@dataclass(slots=True)
+class MiningSummary:
+    hashrate: int | None = None
+    validShares: int | None = None
+    invalidShares: int | None = None
+    staleShares: int | None = None
+    badShares: int | None = None
+    lowDiffShares: int | None = None
+    revenue: float | None = None
+
+
+def _epoch(timestamp: str) -> float:
+    # datetime.fromisoformat only accepts the `Z` suffix from python 3.11
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+
+@dataclass(slots=True)
+class HashrateSeries:
+    """
+    Struct of arrays for long hashrate timeseries: two packed float64 buffers,
+    16 bytes per point, instead of one object per point.
+
+    timestamps : seconds since the epoch, UTC.
+    hashrates : hashrate in H/s.
+    """
+
+    timestamps: array[float] = field(default_factory=lambda: array("d"))
+    hashrates: array[float] = field(default_factory=lambda: array("d"))
+
+    @classmethod
+    def from_points(cls, timestamps: list[str], hashrates: list[int]) -> HashrateSeries:
+        return cls(
+            array("d", map(_epoch, timestamps)),
+            array("d", map(float, hashrates)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        return zip(self.timestamps, self.hashrates)
+
+    def __getitem__(self, index: int) -> tuple[float, float]:
+        return self.timestamps[index], self.hashrates[index]
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Any
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
+
+MODES = ("table", "stream", "pager")
+
+
+class TableRenderer:
+    """
+    Renders GraphQL results in the terminal. Used as the `sink` of a client,
+    which hands it every response; the CLI enables it, library callers don't.
+
+    Modes
+    -----
+    table
+        A rich table, the historical output of the CLI.
+    stream
+        One plain tab separated line per row, written as it is formatted.
+        No table is built so large results print in constant memory.
+    pager
+        A rich table shown through the system pager.
+    """
+
+    def __init__(
+        self,
+        mode: str = "table",
+        max_rows: int | None = None,
+        console: Console | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        mode : str
+            One of `table`, `stream` or `pager`. Default is `table`.
+
+        max_rows : int
+            Maximum number of rows rendered, the rest are summarized in one line. Default is all rows.
+
+        console : Console
+            Rich console to render to. Default is a new console on stdout.
+        """
+
+        if mode not in MODES:
+            raise ValueError(f"Unknown render mode {mode!r}, options are: {MODES}")
+
+        self.mode = mode
+        self.max_rows = max_rows
+        if console is None:
+            from rich.console import Console
+
+            console = Console()
+        self.console = console
+
+    def __call__(self, json_result: dict[str, Any]) -> None:
+        try:
+            data: dict[str, Any] = json_result["data"]
+            # Obtain the first key, usually the graphql operation
+            graphql_operation: str = list(data.keys())[0]
+            result: dict[str, Any] = data[graphql_operation]
+            edges: list[dict[str, Any]] | None = result.get("edges")
+
+            if edges is None or len(edges) == 0:
+                self.console.print_json(data=result)
+                return
+
+            # Get the columns for the result based on a sample of the result
+            columns = list(edges[0]["node"].keys())
+            shown = edges if self.max_rows is None else edges[: self.max_rows]
+
+            if self.mode == "stream":
+                self._stream(columns, shown)
+            else:
+                table = self._table(graphql_operation, columns, shown)
+                if self.mode == "pager":
+                    with self.console.pager(styles=True):
+                        self.console.print(table)
+                else:
+                    self.console.print(table)
+
+            if len(shown) < len(edges):
+                self.console.print(
+                    f"[yellow]... {len(edges) - len(shown)} more rows[/yellow]",
+                )
+
+        except Exception:
+            self.console.print(json_result)
+
+    def _table(
+        self,
+        graphql_operation: str,
+        columns: list[str],
+        edges: list[dict[str, Any]],
+    ) -> Table:
+        from rich.table import Table
+
+        table = Table(
+            show_header=True,
+            header_style="yellow",
+            show_lines=True,
+            title=f"Result: {graphql_operation}",
+            title_style="bold yellow",
+        )
+
+        for column_name in columns:
+            table.add_column(column_name)
+
+        for row in edges:
+            table.add_row(*[str(row["node"].get(column)) for column in columns])
+
+        return table
+
+    def _stream(self, columns: list[str], edges: list[dict[str, Any]]) -> None:
+        self.console.print("\t".join(columns), style="yellow", highlight=False)
+        for row in edges:
+            self.console.out(
+                "\t".join(str(row["node"].get(column)) for column in columns),
+                highlight=False,
+            )
@@ -1,14 +1,304 @@
 from __future__ import annotations
 
+import sys
+import time
+from dataclasses import fields as record_fields
+from functools import wraps
 from typing import Any
+from typing import Callable
+from typing import cast
+from typing import Iterable
+from typing import TYPE_CHECKING
+from typing import TypeVar
 
 import pandas as pd
 
+from metrics import RequestTiming
+from records import HashratePoint
+from records import HashrateScore
+from records import HashrateSeries
+from records import MiningSummary
+from records import Transaction
+from records import WorkerDetail
+
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+
+R = TypeVar("R", bound="DataclassInstance")
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Dtype of each field, by field name. Hashrates and share counts are sent as big
+# numeric strings and timestamps as ISO strings, everything else stays as is.
+NUMERIC_FIELDS = {
+    "hashrate",
+    "validShares",
+    "invalidShares",
+    "staleShares",
+    "badShares",
+    "duplicateShares",
+    "lowDiffShares",
+    "efficiency",
+    "revenue",
+    "amount",
+}
+DATETIME_FIELDS = {"time", "timestamp", "updatedAt", "createdAt", "date"}
+CATEGORICAL_FIELDS = {"status", "currency"}
+
+
+def _nodes(json: dict[str, Any], operation: str) -> list[dict[str, Any]]:
+    connection: dict[str, Any] = json["data"][operation]
+    if "nodes" in connection:
+        nodes: list[dict[str, Any]] = connection["nodes"]
+        return nodes
+    return [edge["node"] for edge in connection["edges"]]
+
+
+def _paths(nodes: list[dict[str, Any]]) -> list[tuple[str, ...]]:
+    """
+    Returns the path of every leaf field. GraphQL nodes all carry the same selection,
+    so the first node describes them all; nested objects that are null there are
+    described by the first node where they are not.
+    """
+
+    def walk(node: dict[str, Any], prefix: tuple[str, ...]) -> list[tuple[str, ...]]:
+        paths: list[tuple[str, ...]] = []
+        for key, value in node.items():
+            path = (*prefix, key)
+            if value is None and len(nodes) > 1:
+                value = next(
+                    (
+                        n
+                        for n in (_get(other, path) for other in nodes)
+                        if n is not None
+                    ),
+                    None,
+                )
+            if isinstance(value, dict):
+                paths += walk(value, path)
+            else:
+                paths.append(path)
+        return paths
+
+    return walk(nodes[0], ()) if nodes else []
+
+
+def _check_fields(nodes: list[dict[str, Any]], fields: list[str]) -> None:
+    """
+    Raises ValueError for requested fields that are neither a leaf nor a nested
+    object of the nodes, like `queries.select` does for the query. Nothing is
+    checked without nodes, an empty page has no fields to compare with.
+    """
+
+    if not nodes:
+        return
+    available = [".".join(path) for path in _paths(nodes)]
+    for field in fields:
+        if not any(path == field or path.startswith(f"{field}.") for path in available):
+            raise ValueError(
+                f"No field {field!r} in the response, options are: {', '.join(available)}",
+            )
+
+
+def _get(node: Any, path: tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def _flatten(
+    nodes: Iterable[dict[str, Any]],
+    fields: list[str] | None = None,
+) -> dict[str, list[Any]]:
+    """
+    Builds one list per leaf field, ready to be turned into a single DataFrame.
+    Nested objects become prefixed columns, e.g. `details1H.hashrate`, and values
+    are looked up by name so the order of the keys sent by the server does not matter.
+
+    fields (list): columns to keep, in order. A nested object, e.g. `details1H`, keeps
+        all its fields. Defaults to every field of the nodes.
+    """
+
+    nodes = list(nodes)
+    if fields is None:
+        paths = _paths(nodes)
+    else:
+        available = _paths(nodes)
+        paths = []
+        for field in fields:
+            path = tuple(field.split("."))
+            paths += [
+                other
+                for other in available
+                if len(other) > len(path) and other[: len(path)] == path
+            ] or [path]
+
+    columns: dict[str, list[Any]] = {}
+    for path in paths:
+        try:
+            # fast path, every node carries the field
+            if len(path) == 1:
+                (key,) = path
+                column = [node[key] for node in nodes]
+            elif len(path) == 2:
+                outer, inner = path
+                column = [node[outer][inner] for node in nodes]
+            else:
+                column = [_get(node, path) for node in nodes]
+        except (KeyError, TypeError):
+            column = [_get(node, path) for node in nodes]
+        columns[".".join(path)] = column
+    return columns
+
+
+def _number(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _records(
+    record: type[R] | None,
+    columns: dict[str, list[Any]],
+    names: dict[str, str] | None = None,
+) -> list[R] | list[dict[str, Any]]:
+    """
+    Builds one record per row from columns. Columns are matched to the record
+    fields on their (renamed) last component, e.g. `details1H.hashrate` fills
+    `hashrate`, and columns the record does not declare are dropped. Numeric
+    strings become numbers and categorical strings are interned, so repeated
+    values like statuses share one object. Fields without a column are None.
+    Without a record type rows are dicts.
+    """
+
+    values: dict[str, list[Any]] = {}
+    for column, column_values in columns.items():
+        field = (names or {}).get(column, column).rsplit(".", 1)[-1]
+        if field in NUMERIC_FIELDS:
+            column_values = [_number(value) for value in column_values]
+        elif field in CATEGORICAL_FIELDS:
+            column_values = [
+                sys.intern(value) if isinstance(value, str) else value
+                for value in column_values
+            ]
+        values[field] = column_values
+
+    if not values:
+        empty: list[R] = []
+        return empty
+    if record is None:
+        return [dict(zip(values, row)) for row in zip(*values.values())]
+
+    rows = len(next(iter(values.values())))
+    missing = [None] * rows
+    ordered = [values.get(field.name, missing) for field in record_fields(record)]
+    return [record(*row) for row in zip(*ordered)]
+
+
+def _frame(
+    columns: dict[str, list[Any]],
+    names: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    """
+    Builds a DataFrame from columns and coerces every known field to its dtype:
+    numbers, UTC datetime64 and categoricals. Nested columns are matched on
+    their last component, e.g. `details1H.hashrate` is numeric.
+    """
+
+    data: dict[str, Any] = {}
+    for column, values in columns.items():
+        field = column.rsplit(".", 1)[-1]
+        if field in NUMERIC_FIELDS:
+            data[column] = pd.to_numeric(values, errors="coerce")
+        elif field in DATETIME_FIELDS:
+            data[column] = pd.to_datetime(values, utc=True, errors="coerce")
+        elif field in CATEGORICAL_FIELDS:
+            data[column] = pd.Categorical(values)
+        else:
+            data[column] = values
+
+    df = pd.DataFrame(data)
+
+    if names:
+        df = df.rename(columns=names)
+    return df
+
+
+def _record_batch(
+    columns: dict[str, list[Any]],
+    names: dict[str, str] | None = None,
+) -> pa.RecordBatch:
+    """
+    Builds an Arrow RecordBatch from columns, with the same dtype rules as `_frame`:
+    integers or floats for numeric strings, UTC timestamps and dictionary encoded
+    categoricals.
+    """
+
+    arrays = []
+    for column, values in columns.items():
+        field = column.rsplit(".", 1)[-1]
+        array = pa.array(values)
+        if field in NUMERIC_FIELDS and pa.types.is_string(array.type):
+            try:
+                array = array.cast(pa.int64())
+            except pa.ArrowInvalid:
+                array = array.cast(pa.float64())
+        elif field in DATETIME_FIELDS and pa.types.is_string(array.type):
+            try:
+                array = array.cast(pa.timestamp("us", tz="UTC"))
+            except pa.ArrowInvalid:
+                # dates and timestamps without a zone offset
+                array = array.cast(pa.timestamp("us")).cast(
+                    pa.timestamp("us", tz="UTC"),
+                )
+        elif field in CATEGORICAL_FIELDS and pa.types.is_string(array.type):
+            array = array.dictionary_encode()
+        arrays.append(array)
+
+    return pa.RecordBatch.from_arrays(
+        arrays,
+        names=[(names or {}).get(column, column) for column in columns],
+    )
+
+
+def _timed(method: F) -> F:
+    """
+    Reports the time spent in a resolver method to the `metrics` callback, if any,
+    as the `resolve` phase of an operation named after the method.
+    """
+
+    @wraps(method)
+    def timed(self: RESOLVERS, *args: Any, **kwargs: Any) -> Any:
+        if self.metrics is None:
+            return method(self, *args, **kwargs)
+
+        timing = RequestTiming(method.__name__)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        except BaseException as error:
+            timing.status = type(error).__name__
+            raise
+        finally:
+            timing.phases["resolve"] = time.perf_counter() - start
+            self.metrics(timing)
+
+    return cast(F, timed)
+
 
 class RESOLVERS:
     """
-    A class used to resolve (format) GraphQL API responses into a Python list
-    or Pandas DataFrame from Luxor's API.
+    A class used to resolve (format) GraphQL API responses into a Python list,
+    Pandas DataFrame or Arrow RecordBatch from Luxor's API.
 
     Methods
     -------
@@ -47,47 +337,125 @@ class RESOLVERS:
 
     resolve_get_revenue_ph(json)
         Returns a formatted object of average Hashprice per PH over the last 24H.
+
+    Methods resolving a projectable query also take the `fields` passed to its
+    luxor.py wrapper, the columns then match the fields requested. Fields missing
+    from the response raise a ValueError.
     """
 
-    def __init__(self, df: bool = False):
+    def __init__(
+        self,
+        df: bool = False,
+        arrow: bool = False,
+        series: bool = False,
+        metrics: Callable[[RequestTiming], None] | None = None,
+    ):
         """
         Parameters
         ----------
         df : boolean
             A boolean flag that determines the output of each method. Default = True.
+            When no flag is set, rows are returned as the typed records of `records.py`.
+
+        arrow : boolean
+            A boolean flag that makes each method return a `pyarrow.RecordBatch`, see
+            `datalake.write_partitioned` to persist them. Takes precedence over `df`. Default = False.
+
+        series : boolean
+            Without `df` or `arrow`, return hashrate timeseries as a compact
+            `records.HashrateSeries` instead of a list of `HashratePoint`. Default = False.
+
+        metrics : callable
+            Optional callable receiving a `metrics.RequestTiming` with the `resolve`
+            duration of every call, e.g. the `metrics.Metrics()` of the client. Default = None.
         """
 
+        if arrow and pa is None:
+            raise ImportError("pyarrow is required to resolve into Arrow RecordBatches")
+
         self.df = df
+        self.arrow = arrow
+        self.series = series
+        self.metrics = metrics
 
+    def _table(
+        self,
+        nodes: list[dict[str, Any]],
+        fields: list[str] | None = None,
+        names: dict[str, str] | None = None,
+        record: type[Any] | None = None,
+        default: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
+        """
+        Builds the output from nodes. Requested `fields` must be in the nodes,
+        the `default` ones are taken as they are and missing ones left empty.
+        """
+
+        if fields:
+            _check_fields(nodes, fields)
+        columns = _flatten(nodes, fields or default)
+        if self.arrow:
+            return _record_batch(columns, names)
+        if self.df:
+            return _frame(columns, names)
+        return _records(record, columns, names)
+
+    def _history(
+        self,
+        nodes: list[dict[str, Any]],
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch | HashrateSeries:
+        if self.series and not (self.df or self.arrow):
+            # a series needs both fields, a projected query must keep them
+            if fields:
+                _check_fields(nodes, fields)
+            columns = _flatten(nodes, ["time", "hashrate"])
+            return HashrateSeries.from_points(columns["time"], columns["hashrate"])
+        return self._table(
+            nodes,
+            fields,
+            names={"time": "timestamp"},
+            record=HashratePoint,
+            default=["time", "hashrate"],
+        )
+
+    @_timed
     def resolve_get_subaccounts(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of all subaccounts that belong to the Profile owner of the API Key.
         """
 
-        data = [list(i["node"].values())[0] for i in json["data"]["users"]["edges"]]
+        nodes = _nodes(json, "users")
 
-        if self.df:
-            return pd.DataFrame(data, columns=["subaccounts"])
+        if self.df or self.arrow:
+            return self._table(
+                nodes,
+                names={"username": "subaccounts"},
+                default=["username"],
+            )
         else:
-            return data
+            return [node["username"] for node in nodes]
 
+    @_timed
     def resolve_get_subaccount_mining_summary(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of a subaccount hashrate timeseries.
         """
 
         data = json["data"]["getMiningSummary"]
 
-        if self.df:
-            return pd.DataFrame(
-                data,
-                columns=[
+        if self.df or self.arrow:
+            return self._table(
+                [data],
+                fields,
+                default=[
                     "hashrate",
                     "validShares",
                     "invalidShares",
@@ -96,182 +464,165 @@ class RESOLVERS:
                     "lowDiffShares",
                     "revenue",
                 ],
-                index=[0],
             )
         else:
-            return data
+            if fields:
+                _check_fields([data], fields)
+            return _records(MiningSummary, _flatten([data], fields))[0]
 
+    @_timed
     def resolve_get_subaccount_hashrate_history(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of a subaccount hashrate timeseries.
         """
 
-        data = [
-            list(i["node"].values())
-            for i in json["data"]["getHashrateHistory"]["edges"]
-        ]
-
-        if self.df:
-            return pd.DataFrame(data, columns=["timestamp", "hashrate"])
-
-        return data
+        return self._history(_nodes(json, "getHashrateHistory"), fields)
 
+    @_timed
     def resolve_get_worker_details(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of all workers pointed to a subaccount hashrate and efficiency details.
         Can be used for 1H and 24H API calls.
         """
 
-        data = [list(i["node"].values()) for i in json["data"]["miners"]["edges"]]
-
-        if self.df:
-            return pd.concat(
-                [
-                    pd.DataFrame([i[0] for i in data], columns=["workerNames"]),
-                    pd.DataFrame.from_dict([i[1] for i in data]),
-                ],
-                axis=1,
-            )
-        return data
+        return self._table(_nodes(json, "miners"), fields, record=WorkerDetail)
 
+    @_timed
     def resolve_get_unrestricted_worker_details(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of all workers pointed to a subaccount hashrate and efficiency details.
         """
 
-        data = [
-            list(i["node"].values()) for i in json["data"]["getWorkerDetails"]["edges"]
-        ]
-
-        if self.df:
-            return pd.DataFrame(
-                data,
-                columns=[
-                    "workerName",
-                    "hashrate",
-                    "validShares",
-                    "staleShares",
-                    "badShares",
-                    "duplicateShares",
-                    "invalidShares",
-                    "lowDiffShares",
-                    "efficiency",
-                    "revenue",
-                    "status",
-                    "updatedAt",
-                ],
-            )
-        return data
-
+        return self._table(
+            _nodes(json, "getWorkerDetails"),
+            fields,
+            record=WorkerDetail,
+            default=[
+                "workerName",
+                "hashrate",
+                "validShares",
+                "staleShares",
+                "badShares",
+                "duplicateShares",
+                "invalidShares",
+                "lowDiffShares",
+                "efficiency",
+                "revenue",
+                "status",
+                "updatedAt",
+            ],
+        )
+
+    @_timed
     def resolve_get_worker_hashrate_history(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of a miner hashrate timeseries.
         """
 
-        data = [
-            list(i["node"].values())
-            for i in json["data"]["getWorkerHashrateHistory"]["edges"]
-        ]
-
-        if self.df:
-            return pd.DataFrame(data, columns=["timestamp", "hashrate"])
-
-        return data
+        return self._history(_nodes(json, "getWorkerHashrateHistory"), fields)
 
+    @_timed
     def resolve_get_profile_active_worker_count(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of a Profile active workers.
         Workers are classified as active if we recorded a share in the last 15 minutes.
         """
 
-        if self.df:
-            return pd.DataFrame(
-                [json["data"]["getProfileActiveWorkers"]],
-                columns=["activeWorkers"],
+        if self.df or self.arrow:
+            return self._table(
+                [{"activeWorkers": json["data"]["getProfileActiveWorkers"]}],
             )
 
         return json["data"]["getProfileActiveWorkers"]
 
+    @_timed
     def resolve_get_profile_inactive_worker_count(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object a Profile inactive workers.
         Workers are classified as inactive if we have not recorded a share in the last 15 minutes.
         """
 
-        if self.df:
-            return pd.DataFrame(
-                [json["data"]["getProfileInactiveWorkers"]],
-                columns=["inactiveWorkers"],
+        if self.df or self.arrow:
+            return self._table(
+                [{"inactiveWorkers": json["data"]["getProfileInactiveWorkers"]}],
             )
 
         return json["data"]["getProfileInactiveWorkers"]
 
+    @_timed
     def resolve_get_transaction_history(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of on-chain transactions for a subaccount and currency combo.
         """
 
-        data = [
-            list(i["node"].values())
-            for i in json["data"]["getAllTransactionHistory"]["edges"]
-        ]
-
-        if self.df:
-            return pd.DataFrame(
-                data,
-                columns=["transactionId", "amount", "status", "payoutAddress", "currency", "createdAt"],
-            )
-
-        return data
-
+        return self._table(
+            _nodes(json, "getAllTransactionHistory"),
+            fields,
+            record=Transaction,
+            default=[
+                "transactionId",
+                "amount",
+                "status",
+                "payoutAddress",
+                "currency",
+                "createdAt",
+            ],
+        )
+
+    @_timed
     def resolve_get_hashrate_score_history(
         self,
         json: dict[str, Any],
-    ) -> list[Any] | pd.DataFrame:
+        fields: list[str] | None = None,
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of subaccount earnings, scoring hashrate and efficiency per day.
         """
 
-        data = [
-            list(i.values()) for i in json["data"]["getHashrateScoreHistory"]["nodes"]
-        ]
-
-        if self.df:
-            return pd.DataFrame(
-                data,
-                columns=["date", "hashrate", "efficiency", "revenue"],
-            )
-
-        return data
+        return self._table(
+            _nodes(json, "getHashrateScoreHistory"),
+            fields,
+            record=HashrateScore,
+            default=["date", "hashrate", "efficiency", "revenue"],
+        )
 
-    def resolve_get_revenue_ph(self, json: dict[str, Any]) -> list[Any] | pd.DataFrame:
+    @_timed
+    def resolve_get_revenue_ph(
+        self,
+        json: dict[str, Any],
+    ) -> list[Any] | pd.DataFrame | pa.RecordBatch:
         """
         Returns a formatted object of average Hashprice per PH over the last 24H.
         """
 
         data = json["data"]
-        if self.df:
-            return pd.DataFrame(data, index=[0])
+        if self.df or self.arrow:
+            return self._table([data])
         else:
             return data["getRevenuePh"]
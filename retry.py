@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from exceptions import GraphQlHTTPError
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Returns the seconds to wait from a `Retry-After` header, given either as a
+    number of seconds or as an HTTP date. None if the header is missing or invalid.
+    """
+
+    from email.utils import parsedate_to_datetime
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request.
+
+    Requests failing with one of `statuses` or a connection error are retried
+    up to `max_attempts` times in total. The wait before retry `n` is drawn
+    uniformly from [0, min(max_backoff, backoff * 2**n)] ("full jitter"), so
+    clients failing together do not retry together. A `Retry-After` header
+    sent by the API takes precedence.
+
+    Mutations are only retried on 429, the one status guaranteeing the
+    operation was not executed.
+    """
+
+    max_attempts: int = 5
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Seconds to wait before retrying, after `attempt` failed attempts (starting at 0).
+        """
+
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def next_delay(
+        self,
+        error: BaseException,
+        attempt: int,
+        transient: tuple[type[BaseException], ...] = (),
+        mutation: bool = False,
+    ) -> float | None:
+        """
+        Returns the seconds to wait before retrying after `error`, or None if the
+        error should be raised.
+
+        error (exception): error raised by the failed attempt.
+        attempt (int): number of attempts already failed before this one.
+        transient (tuple): connection errors of the HTTP library that are safe to retry.
+        mutation (bool): the request is a mutation.
+        """
+
+        if attempt + 1 >= self.max_attempts:
+            return None
+
+        if isinstance(error, GraphQlHTTPError):
+            if error.status not in self.statuses:
+                return None
+            if mutation and error.status != 429:
+                return None
+            return self.delay(attempt, error.retry_after)
+
+        if not mutation and transient and isinstance(error, transient):
+            return self.delay(attempt)
+        return None
+
+
+class TokenBucket:
+    """
+    Client side rate limiter: at most `rate` requests per second on average,
+    with bursts of up to `capacity` requests. Thread safe; share one instance
+    between clients, sync and async, to keep all of them under the same quota.
+
+    Callers reserve a token and wait their turn, so concurrent callers are
+    served in order instead of polling. A 429 answer can `pause` the bucket
+    so every caller backs off together.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """
+        Parameters
+        ----------
+        rate : float
+            Tokens added per second.
+
+        capacity : float
+            Maximum number of tokens, i.e. the largest burst. Default is `rate`.
+        """
+
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Takes `tokens` from the bucket and returns the seconds to wait before using them.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return max(0.0, self._updated - now)
+            return self._updated - now - self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hands out no token for the next `seconds`, e.g. the `Retry-After` of a 429.
+        """
+
+        with self._lock:
+            resume = time.monotonic() + seconds
+            if resume > self._updated:
+                self._tokens = min(self._tokens, 0.0)
+                self._updated = resume
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Blocks until `tokens` are available.
+        """
+
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """
+        Awaitable variant of `acquire`, waits without blocking the event loop.
+        """
+
+        import asyncio
+
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
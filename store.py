@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any
+from typing import Iterable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from client import GraphQlClient
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """
+    How the rows of a history endpoint are identified and ordered.
+
+    ts : field holding the row timestamp, used as the sync watermark.
+    endpoint_id : field uniquely identifying a row, rows are upserted on it.
+    items : connection field holding the rows, `edges` or `nodes`.
+    descending : True if the API returns the newest rows first, which lets a sync
+        stop paginating as soon as it reaches rows already stored. Syncs of oldest
+        first endpoints resume after the cursor of the last page instead.
+    """
+
+    ts: str
+    endpoint_id: str
+    items: str = "edges"
+    descending: bool = True
+
+
+ENDPOINTS: dict[str, Endpoint] = {
+    "getHashrateScoreHistory": Endpoint(ts="date", endpoint_id="date", items="nodes"),
+    "getAllTransactionHistory": Endpoint(ts="createdAt", endpoint_id="transactionId"),
+    "getTransactionHistory": Endpoint(ts="createdAt", endpoint_id="transactionId"),
+    "getHashrateHistory": Endpoint(ts="time", endpoint_id="time", descending=False),
+    "getWorkerHashrateHistory": Endpoint(
+        ts="time",
+        endpoint_id="time",
+        descending=False,
+    ),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    endpoint TEXT NOT NULL,
+    subaccount TEXT NOT NULL,
+    key TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    id TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    node TEXT NOT NULL,
+    PRIMARY KEY (endpoint, subaccount, key, worker, id)
+);
+CREATE INDEX IF NOT EXISTS records_ts ON records (endpoint, subaccount, key, worker, ts);
+CREATE TABLE IF NOT EXISTS watermarks (
+    endpoint TEXT NOT NULL,
+    subaccount TEXT NOT NULL,
+    key TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    cursor TEXT,
+    first TEXT,
+    PRIMARY KEY (endpoint, subaccount, key, worker)
+);
+"""
+
+# `cursor` and `first` were added to the watermarks of existing stores
+_RESUME_COLUMNS = """
+ALTER TABLE watermarks ADD COLUMN cursor TEXT;
+ALTER TABLE watermarks ADD COLUMN first TEXT;
+"""
+
+
+class SyncStore:
+    """
+    Local SQLite copy of the history endpoints. It remembers the newest timestamp
+    synced for every (endpoint, subaccount, mpn/cid, worker) and only fetches rows
+    newer than it, so past days and settled transactions are downloaded once.
+
+    Methods
+    -------
+    sync(client, query, params, endpoint, subaccount, key, worker, page_size)
+        Fetches the rows newer than the watermark and merges them into the store.
+
+    watermark(endpoint, subaccount, key, worker)
+        Returns the newest timestamp stored.
+
+    nodes(endpoint, subaccount, key, worker)
+        Returns the stored rows, newest first.
+
+    as_response(endpoint, subaccount, key, worker)
+        Returns the stored rows shaped like an API response, ready for `RESOLVERS`.
+    """
+
+    def __init__(self, path: str = "luxor.db"):
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite database file. Default is `luxor.db`.
+        """
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        columns = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(watermarks)")
+        }
+        if "cursor" not in columns:
+            self.connection.executescript(_RESUME_COLUMNS)
+
+    def __enter__(self) -> SyncStore:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def watermark(
+        self,
+        endpoint: str,
+        subaccount: str,
+        key: str,
+        worker: str = "",
+    ) -> str | None:
+        row = self.connection.execute(
+            "SELECT ts FROM watermarks WHERE endpoint = ? AND subaccount = ? AND key = ? AND worker = ?",
+            (endpoint, subaccount, key, worker),
+        ).fetchone()
+        return None if row is None else str(row[0])
+
+    def merge(
+        self,
+        endpoint: str,
+        subaccount: str,
+        key: str,
+        nodes: Iterable[dict[str, Any]],
+        worker: str = "",
+    ) -> int:
+        """
+        Upserts rows and moves the watermark forward. Returns the number of rows written.
+        """
+
+        spec = ENDPOINTS[endpoint]
+        rows = [
+            (
+                endpoint,
+                subaccount,
+                key,
+                worker,
+                str(node[spec.endpoint_id]),
+                str(node[spec.ts]),
+                json.dumps(node),
+            )
+            for node in nodes
+        ]
+        if not rows:
+            return 0
+
+        newest = max(row[5] for row in rows)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.connection.execute(
+                """INSERT INTO watermarks (endpoint, subaccount, key, worker, ts)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (endpoint, subaccount, key, worker)
+                DO UPDATE SET ts = MAX(ts, excluded.ts)""",
+                (endpoint, subaccount, key, worker, newest),
+            )
+        return len(rows)
+
+    def sync(
+        self,
+        client: GraphQlClient,
+        query: str,
+        params: dict[str, Any],
+        endpoint: str,
+        subaccount: str,
+        key: str,
+        worker: str = "",
+        page_size: int = 100,
+    ) -> int:
+        """
+        Fetches the rows newer than the stored watermark and merges them.
+        Returns the number of rows written.
+
+        For endpoints returned newest first pagination stops at the first page
+        reaching already stored rows. Rows sharing the watermark timestamp are
+        fetched again so late updates (e.g. a transaction status) are picked up.
+
+        Endpoints returned oldest first resume after the cursor preceding the last
+        page synced, so only that page is transferred again along with the new rows.
+        If it does not start with the same row anymore (e.g. the cursors moved with
+        the window), the whole window is fetched and filtered instead.
+        """
+
+        watermark = self.watermark(endpoint, subaccount, key, worker)
+        resume = None
+        if not ENDPOINTS[endpoint].descending:
+            resume = self._resume(endpoint, subaccount, key, worker)
+
+        arguments = (client, query, params, endpoint, subaccount, key, worker)
+        written = self._sync_pages(*arguments, page_size, watermark, resume)
+        if written is None:
+            written = self._sync_pages(*arguments, page_size, watermark, None)
+        return written or 0
+
+    def _resume(
+        self,
+        endpoint: str,
+        subaccount: str,
+        key: str,
+        worker: str,
+    ) -> tuple[str | None, str] | None:
+        """
+        Returns the cursor preceding the last page synced and the timestamp of its
+        first row, None if unknown.
+        """
+
+        row = self.connection.execute(
+            "SELECT cursor, first FROM watermarks WHERE endpoint = ? AND subaccount = ? AND key = ? AND worker = ?",
+            (endpoint, subaccount, key, worker),
+        ).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return row[0], row[1]
+
+    def _sync_pages(
+        self,
+        client: GraphQlClient,
+        query: str,
+        params: dict[str, Any],
+        endpoint: str,
+        subaccount: str,
+        key: str,
+        worker: str,
+        page_size: int,
+        watermark: str | None,
+        resume: tuple[str | None, str] | None,
+    ) -> int | None:
+        """
+        Fetches and merges the pages following the `resume` cursor, or every page.
+        Returns None, with nothing merged, if the first page does not start with the
+        row expected after `resume`.
+        """
+
+        spec = ENDPOINTS[endpoint]
+        cursor = None if resume is None else resume[0]
+        last: tuple[str | None, str] | None = None
+
+        written = 0
+        for page in client.paginate(
+            query,
+            params,
+            endpoint,
+            page_size,
+            render=False,
+            after=cursor,
+        ):
+            connection = page["data"][endpoint]
+            items = connection[spec.items]
+            nodes = [item["node"] if spec.items == "edges" else item for item in items]
+            if resume is not None and last is None:
+                if not nodes or str(nodes[0][spec.ts]) != resume[1]:
+                    return None
+            fresh = [
+                node
+                for node in nodes
+                if watermark is None or str(node[spec.ts]) >= watermark
+            ]
+            written += self.merge(endpoint, subaccount, key, fresh, worker)
+
+            if spec.descending and len(fresh) < len(nodes):
+                break
+            if nodes:
+                last = (cursor, str(nodes[0][spec.ts]))
+            cursor = (connection.get("pageInfo") or {}).get("endCursor")
+
+        if last is not None and not spec.descending:
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE watermarks SET cursor = ?, first = ? WHERE endpoint = ? AND subaccount = ? AND key = ? AND worker = ?",
+                    (*last, endpoint, subaccount, key, worker),
+                )
+        return written
+
+    def nodes(
+        self,
+        endpoint: str,
+        subaccount: str,
+        key: str,
+        worker: str = "",
+    ) -> list[dict[str, Any]]:
+        rows = self.connection.execute(
+            "SELECT node FROM records WHERE endpoint = ? AND subaccount = ? AND key = ? AND worker = ? ORDER BY ts DESC",
+            (endpoint, subaccount, key, worker),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def as_response(
+        self,
+        endpoint: str,
+        subaccount: str,
+        key: str,
+        worker: str = "",
+    ) -> dict[str, Any]:
+        """
+        Returns the stored rows shaped like the API response, so the `RESOLVERS`
+        methods can read from the store directly.
+        """
+
+        nodes = self.nodes(endpoint, subaccount, key, worker)
+        if ENDPOINTS[endpoint].items == "nodes":
+            return {"data": {endpoint: {"nodes": nodes}}}
+        return {"data": {endpoint: {"edges": [{"node": node} for node in nodes]}}}
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Union
+
+from exceptions import DeadlineExceeded
+
+# (connect, read) seconds, a single number for both or None to wait forever.
+Timeout = Union[float, tuple[Union[float, None], Union[float, None]], None]
+
+
+def split_timeout(timeout: Timeout) -> tuple[float | None, float | None]:
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+class Deadline:
+    """
+    Point in time after which an operation must be abandoned, shared by every
+    attempt and page of a call: retries and later pages only get the time left.
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Parameters
+        ----------
+        seconds : float
+            Time budget from now.
+        """
+
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    @classmethod
+    def of(cls, deadline: Deadline | float | None) -> Deadline | None:
+        """
+        Returns `deadline` as a Deadline, starting the clock if it is a number of seconds.
+        """
+
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+    def check(self) -> None:
+        """
+        Raises DeadlineExceeded if no time is left.
+        """
+
+        if self.expired:
+            raise DeadlineExceeded(self.seconds)
+
+    def clamp(self, timeout: Timeout) -> tuple[float, float]:
+        """
+        Caps connect and read timeouts to the time left.
+        """
+
+        remaining = self.remaining()
+        connect, read = split_timeout(timeout)
+        return (
+            remaining if connect is None else min(connect, remaining),
+            remaining if read is None else min(read, remaining),
+        )
+
+
+class LatencyWindow:
+    """
+    Rolling window of the latest request latencies, used to decide when a
+    request is slow enough to be hedged.
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        """
+        Parameters
+        ----------
+        size : int
+            Number of latencies kept. Default is 200.
+
+        min_samples : int
+            Number of latencies needed before a percentile is reported. Default is 20.
+        """
+
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float = 0.95) -> float | None:
+        """
+        Returns the `q` quantile of the window, or None while it has too few samples.
+        """
+
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import TYPE_CHECKING
+
+from exceptions import GraphQlClientError
+from luxor import build_get_subaccount_workers_status
+from luxor import build_get_worker_details
+
+if TYPE_CHECKING:
+    from client import GraphQlClient
+
+# Fields requested on every poll, the only ones compared between two polls.
+WATCH_FIELDS = ["workerName", "status", "hashrate"]
+
+# workerName -> (status, hashrate)
+Snapshot = dict[str, tuple[Any, float]]
+
+
+def _hashrate(value: Any) -> float:
+    return 0.0 if value is None else float(value)
+
+
+def snapshot(nodes: Iterable[dict[str, Any]]) -> Snapshot:
+    """
+    Keys worker rows by `workerName`, keeping only their status and hashrate.
+    """
+
+    return {
+        node["workerName"]: (node.get("status"), _hashrate(node.get("hashrate")))
+        for node in nodes
+    }
+
+
+def _moved(previous: float, current: float, threshold: float) -> bool:
+    if previous == 0:
+        return current != 0
+    return abs(current - previous) > threshold * previous
+
+
+def diff_snapshots(
+    previous: Snapshot,
+    current: Snapshot,
+    threshold: float = 0.1,
+) -> list[dict[str, Any]]:
+    """
+    Returns what changed between two snapshots, as one event per change:
+
+    appeared : a worker absent from `previous`.
+    disappeared : a worker absent from `current`, with its last known values.
+    status : the status of a worker flipped, e.g. from `Active` to `Inactive`.
+    hashrate : the hashrate of a worker moved by more than `threshold`.
+
+    threshold (float): relative hashrate change reported, e.g. 0.1 for 10%.
+    """
+
+    events: list[dict[str, Any]] = []
+    for worker, (status, hashrate) in current.items():
+        if worker not in previous:
+            events.append(
+                {
+                    "event": "appeared",
+                    "workerName": worker,
+                    "status": status,
+                    "hashrate": hashrate,
+                },
+            )
+            continue
+
+        previous_status, previous_hashrate = previous[worker]
+        if status != previous_status:
+            events.append(
+                {
+                    "event": "status",
+                    "workerName": worker,
+                    "from": previous_status,
+                    "to": status,
+                },
+            )
+        if _moved(previous_hashrate, hashrate, threshold):
+            events.append(
+                {
+                    "event": "hashrate",
+                    "workerName": worker,
+                    "from": previous_hashrate,
+                    "to": hashrate,
+                },
+            )
+
+    for worker, (status, hashrate) in previous.items():
+        if worker not in current:
+            events.append(
+                {
+                    "event": "disappeared",
+                    "workerName": worker,
+                    "status": status,
+                    "hashrate": hashrate,
+                },
+            )
+    return events
+
+
+def watch(
+    client: GraphQlClient,
+    subaccount: str,
+    mpn: str,
+    minutes: int = 15,
+    interval: float = 60.0,
+    threshold: float = 0.1,
+    counts: bool = False,
+    page_size: int = 1000,
+    polls: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Polls the workers of a subaccount every `interval` seconds and yields only
+    what changed since the previous poll, see `diff_snapshots`. The first poll
+    records the baseline and yields nothing. Only the last snapshot is kept in
+    memory, and each poll requests the `WATCH_FIELDS` alone.
+
+    Every event carries the poll `time` and the `subaccount`. A poll that fails
+    is logged and skipped, the next one is compared to the last successful one.
+
+    client (GraphQlClient): client sending the requests, nothing is rendered.
+    subaccount (str): subaccount username
+    mpn (str): mining profile name, refers to the coin ticker
+    minutes (int): minutes lookback of the worker metrics
+    interval (float): seconds between the start of two polls
+    threshold (float): relative hashrate change reported, e.g. 0.1 for 10%
+    counts (bool): also report changes of the dead, warning and active worker counts
+    page_size (int): number of workers requested per page
+    polls (int): stop after this many polls. Default is to poll forever.
+    """
+
+    query, params = build_get_worker_details(
+        subaccount,
+        mpn,
+        minutes,
+        page_size,
+        WATCH_FIELDS,
+    )
+    count_query, count_params = build_get_subaccount_workers_status(mpn, subaccount)
+
+    previous: Snapshot | None = None
+    previous_counts: dict[str, Any] | None = None
+    started = time.monotonic()
+    poll = 0
+    while polls is None or poll < polls:
+        delay = started + poll * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        poll += 1
+
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            current = snapshot(
+                item.get("node", item)
+                for item in client.iter_edges(
+                    query,
+                    params,
+                    operation="getWorkerDetails",
+                    page_size=page_size,
+                    render=False,
+                )
+            )
+            current_counts = None
+            if counts:
+                response = client.request(count_query, count_params, render=False)
+                current_counts = response["data"]["getUserMinersStatusCount"]
+        except (GraphQlClientError, OSError) as e:
+            logging.warning(f"Watch poll of {subaccount} failed, skipped: {e}")
+            continue
+
+        events = (
+            [] if previous is None else diff_snapshots(previous, current, threshold)
+        )
+        if previous_counts is not None and current_counts != previous_counts:
+            events.append(
+                {"event": "counts", "from": previous_counts, "to": current_counts},
+            )
+        for event in events:
+            yield {"time": now, "subaccount": subaccount, **event}
+
+        previous, previous_counts = current, current_counts